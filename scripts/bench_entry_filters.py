@@ -0,0 +1,205 @@
+"""
+Micro-benchmark for entry_filters.py against the previous filter functions.
+
+Times the old per-function checks from rebuild_words_db.py and
+build_coincidence_db.py against the compiled FilterEngine on the same
+entries, and checks that both accept and reject exactly the same ones.
+
+Usage:
+    python scripts/bench_entry_filters.py [--limit N] [--repeat N]
+
+Uses rows from data/words.db when it exists, otherwise a small built-in
+sample repeated to --limit entries.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from time import perf_counter
+
+from entry_filters import FilterEngine
+
+SOURCE_DB = "data/words.db"
+
+SAMPLE = [
+    ("gift", "English", "something given; a present"),
+    ("gift", "Norwegian Bokmål", "married"),
+    ("gift", "German", "poison"),
+    ("pain", "French", "bread"),
+    ("-able", "English", "capable of"),
+    ("4x4", "English", "a four-wheel drive vehicle"),
+    ("ice cream", "English", "a frozen dessert"),
+    ("rock'n'roll", "English", "a genre of music"),
+    ("हिन्दी", "Hindi", "the Hindi language"),
+    ("бра", "Russian", "sconce"),
+    ("internationalization", "English", "the act of internationalizing"),
+    ("colour", "English", "alternative form of color"),
+    ("hola", "Spanish", "hola"),
+    ("km²", "English", "square kilometre"),
+    ("e.g.", "English", "for example"),
+    ("zebra", "Translingual", "a taxonomic name"),
+]
+
+# Previous implementations, copied verbatim for comparison
+
+OLD_ALLOWED_WORD_CHARS = set("-'")
+
+
+def old_is_affix(word):
+    return word.startswith("-") or word.endswith("-")
+
+
+def old_has_digits(word):
+    return any(c.isdigit() for c in word)
+
+
+def old_has_disallowed_punctuation(word):
+    if not word:
+        return True
+    import unicodedata
+    for ch in word:
+        if ch.isalnum() or ch in OLD_ALLOWED_WORD_CHARS or unicodedata.category(ch).startswith('M'):
+            continue
+        return True
+    return False
+
+
+def old_is_multiword(word):
+    if not word:
+        return True
+    return any(ch.isspace() for ch in word)
+
+
+def old_is_latin_script(word):
+    if not word:
+        return False
+    latin_chars = sum(1 for ch in word if ord(ch) < 0x0370 and (ch.isalpha() or ch in OLD_ALLOWED_WORD_CHARS))
+    total_chars = len([ch for ch in word if ch.isalpha() or ch in OLD_ALLOWED_WORD_CHARS])
+    return total_chars > 0 and (latin_chars / total_chars) > 0.5
+
+
+def old_normalize_language(lang):
+    if not lang:
+        return ""
+    return " ".join(lang.strip().lower().split())
+
+
+def old_normalize_for_comparison(text):
+    if not text:
+        return ""
+    text = re.sub(r"\([^)]*\)", " ", text)
+    return "".join(ch for ch in text.lower() if ch.isalpha())
+
+
+def old_is_alternative_form_gloss(entry):
+    glosses = (entry.get("glosses") or "").strip()
+    if not glosses:
+        return False
+    primary = re.split(r"[;|/]", glosses, maxsplit=1)[0].strip().lower()
+    return "alternative form of" in primary
+
+
+def old_is_self_referential_gloss(entry):
+    word = (entry.get("word") or "").strip()
+    glosses = (entry.get("glosses") or "").strip()
+    if not word or not glosses:
+        return False
+    word_norm = old_normalize_for_comparison(word)
+    parts = re.split(r"[;|/,]", glosses)
+    for part in parts:
+        part_norm = old_normalize_for_comparison(part)
+        if part_norm == word_norm:
+            return True
+    return False
+
+
+def old_rebuild_rejects(word):
+    return not word or len(word) <= 2 or old_is_affix(word) or old_has_digits(word)
+
+
+def old_coincidence_rejects(e):
+    return not (
+        not old_has_disallowed_punctuation(e.get("word", ""))
+        and not old_is_multiword(e.get("word", ""))
+        and not old_is_alternative_form_gloss(e)
+        and not old_is_self_referential_gloss(e)
+        and old_normalize_language(e.get("lang")) != "translingual"
+        and (not old_is_latin_script(e.get("word", "")) or len(e.get("word", "")) <= 9)
+    )
+
+
+def load_entries(limit):
+    if os.path.exists(SOURCE_DB):
+        conn = sqlite3.connect(SOURCE_DB)
+        rows = conn.execute(
+            "SELECT word, lang, glosses FROM words LIMIT ?", (limit,)
+        ).fetchall()
+        conn.close()
+    else:
+        rows = (SAMPLE * (limit // len(SAMPLE) + 1))[:limit]
+    return [{"word": w, "lang": l, "glosses": g or ""} for w, l, g in rows]
+
+
+def timed(label, func, items, repeat):
+    best = None
+    for _ in range(repeat):
+        began = perf_counter()
+        result = [func(item) for item in items]
+        elapsed = perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    rate = len(items) / best / 1e6 if best else float("inf")
+    print(f"  {label:<34} {best * 1000:9.1f} ms  ({rate:.2f} M entries/s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    began = perf_counter()
+    rebuild_words = FilterEngine(["short", "affix", "digits"], timed=False)
+    print(f"Compiled character classes in {perf_counter() - began:.2f}s")
+    coincidence_words = FilterEngine(["punctuation", "multiword", "long_latin"], timed=False)
+    coincidence_entries = FilterEngine(
+        ["translingual", "alternative_form", "self_referential"], timed=False
+    )
+    rebuild_timed = FilterEngine(["short", "affix", "digits"])
+    stats = Counter()
+
+    entries = load_entries(args.limit)
+    words = [unicodedata.normalize("NFC", e["word"].strip().lower()) for e in entries]
+    print(f"Benchmarking on {len(entries):,} entries")
+
+    print("rebuild_words_db word filters:")
+    old = timed("old functions", old_rebuild_rejects, words, args.repeat)
+    new = timed("FilterEngine", lambda w: rebuild_words.check(w, stats) is not None, words, args.repeat)
+    timed("FilterEngine (timed counters)", lambda w: rebuild_timed.check(w, stats) is not None, words, args.repeat)
+    assert old == new, "rebuild filters disagree"
+
+    print("build_coincidence_db entry filters:")
+    old = timed("old functions", old_coincidence_rejects, entries, args.repeat)
+    new = timed(
+        "FilterEngine",
+        lambda e: coincidence_words.check(e["word"], stats) is not None
+        or coincidence_entries.check(e, stats) is not None,
+        entries,
+        args.repeat,
+    )
+    assert old == new, "coincidence filters disagree"
+
+    print("has_disallowed_punctuation (punctuation rule) alone:")
+    punctuation = FilterEngine(["punctuation"], timed=False)
+    old = timed("old function", old_has_disallowed_punctuation, words, args.repeat)
+    new = timed("compiled regex", lambda w: punctuation.check(w, stats) is not None, words, args.repeat)
+    assert old == new, "punctuation rule disagrees"
+
+    print("✓ Old and new filters agree on every entry")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark for gloss_overlap.py against the previous gloss_distance.
+
+Scores the same groups with the old tokenize-and-compare code from
+build_coincidence_db.py, with interned token IDs and set intersections,
+and (when NumPy is installed) with the incidence-matrix path, and checks
+that all three give exactly the same average overlap for every group.
+
+Usage:
+    python scripts/bench_gloss_overlap.py [--groups N] [--size N] [--repeat N]
+
+Uses the largest pronunciation groups in data/words.db when it has an
+ipa_keys table, otherwise random groups of --size entries with glosses
+drawn from a fixed vocabulary.
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+from itertools import combinations
+from time import perf_counter
+
+import gloss_overlap
+from gloss_overlap import STOP_WORDS, TokenInterner, average_overlaps
+
+SOURCE_DB = "data/words.db"
+
+VOCABULARY = [
+    "water", "river", "stone", "house", "bird", "fish", "tree", "flower",
+    "small", "large", "red", "black", "person", "woman", "child", "hand",
+    "head", "mouth", "road", "village", "king", "boat", "rain", "snow",
+    "fire", "light", "sound", "song", "dance", "sleep", "dream", "grain",
+    "bread", "salt", "horse", "goat", "cattle", "knife", "rope", "cloth",
+    "color", "sister", "brother", "mother", "father", "friend", "enemy",
+]
+
+# Previous implementation, copied verbatim for comparison
+
+
+def old_tokenize_gloss(text):
+    if not text:
+        return set()
+    tokens = re.findall(r"[a-zA-Z]+", text.lower())
+    return {t for t in tokens if len(t) > 2 and t not in STOP_WORDS}
+
+
+def old_gloss_distance(entries):
+    overlaps = []
+    for left, right in combinations(entries, 2):
+        if not left["tokens"] or not right["tokens"]:
+            continue
+        inter = len(left["tokens"] & right["tokens"])
+        union = len(left["tokens"] | right["tokens"])
+        if union == 0:
+            continue
+        overlaps.append(inter / union)
+    if not overlaps:
+        return 0.0  # No overlap means different meanings
+    return sum(overlaps) / len(overlaps)  # Average overlap instead of max
+
+
+def load_groups(count, size):
+    """Lists of kept gloss strings per entry, one list per group"""
+    if os.path.exists(SOURCE_DB):
+        conn = sqlite3.connect(SOURCE_DB)
+        has_keys = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ipa_keys'"
+        ).fetchone()
+        if has_keys:
+            norms = [norm for norm, in conn.execute(
+                "SELECT norm FROM ipa_keys GROUP BY norm ORDER BY COUNT(*) DESC LIMIT ?",
+                (count,),
+            )]
+            groups = []
+            for norm in norms:
+                rows = conn.execute(
+                    """
+                    SELECT w.glosses FROM ipa_keys k
+                    JOIN words w ON w.word = k.word AND w.lang = k.lang
+                    WHERE k.norm = ?
+                    """,
+                    (norm,),
+                ).fetchall()
+                groups.append([
+                    [g.strip() for g in (glosses or "").split("|") if g.strip()][:5]
+                    for glosses, in rows
+                ])
+            conn.close()
+            if groups and len(groups[0]) >= size // 2:
+                return groups
+        conn.close()
+    rng = random.Random(0)
+    return [
+        [
+            [" ".join(rng.sample(VOCABULARY, rng.randint(1, 4))) for _ in range(rng.randint(1, 3))]
+            for _ in range(size)
+        ]
+        for _ in range(count)
+    ]
+
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        began = perf_counter()
+        result = func()
+        elapsed = perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<34} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    groups = load_groups(args.groups, args.size)
+    entries = sum(len(group) for group in groups)
+    print(f"Benchmarking on {len(groups):,} groups ({entries:,} entries, largest {max(map(len, groups))})")
+
+    def old():
+        scores = []
+        for group in groups:
+            scored = []
+            for glosses in group:
+                tokens = set()
+                for g in glosses:
+                    tokens.update(old_tokenize_gloss(g))
+                scored.append({"tokens": tokens})
+            scores.append(old_gloss_distance(scored))
+        return scores
+
+    def new(interner):
+        return average_overlaps([
+            [interner.ids(glosses) for glosses in group]
+            for group in groups
+        ])
+
+    numpy = gloss_overlap.np
+    print("Average gloss overlap per group:")
+    expected = timed("old tokenize + set Jaccard", old, args.repeat)
+    gloss_overlap.np = None
+    result = timed("interned IDs, sets (cold cache)", lambda: new(TokenInterner()), args.repeat)
+    assert result == expected, "set scores disagree"
+    interner = TokenInterner()
+    new(interner)
+    result = timed("interned IDs, sets (warm cache)", lambda: new(interner), args.repeat)
+    assert result == expected, "set scores disagree"
+    gloss_overlap.np = numpy
+    if numpy is None:
+        print("  (NumPy not installed, skipping the matrix path)")
+    else:
+        result = timed("interned IDs, matrix (warm cache)", lambda: new(interner), args.repeat)
+        assert result == expected, "matrix scores disagree"
+
+    print("✓ All scores identical")
+
+
+if __name__ == "__main__":
+    main()
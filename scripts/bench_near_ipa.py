@@ -0,0 +1,126 @@
+"""
+Scaling benchmark for near_ipa.py against brute-force pairwise comparison.
+
+Generates N normalized-IPA-like keys (random words plus one-edit variants
+of some of them), finds all pairs one edit apart with the deletion
+neighbourhood index and, up to --brute-max keys, by comparing every pair.
+Checks both find the same pairs and prints how the time grows with N.
+
+Usage:
+    python scripts/bench_near_ipa.py [--sizes 1000,2000,...] [--brute-max N]
+
+Uses the distinct keys of data/words.db's ipa_keys table (sampled down to
+each size) when it has enough keys for the largest size, otherwise
+synthetic keys for every size, so all rows of the table come from the
+same key distribution.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+from collections import defaultdict
+from itertools import combinations
+from time import perf_counter
+
+from near_ipa import NEAR_MIN_LENGTH, near_pairs
+
+SOURCE_DB = "data/words.db"
+ALPHABET = "abdefgiklmnoprstuvz"
+
+
+def one_edit_apart(a, b):
+    """Plain edit-distance-1 check, for the brute-force comparison"""
+    if len(a) == len(b):
+        return sum(x != y for x, y in zip(a, b)) == 1
+    if abs(len(a) - len(b)) != 1:
+        return False
+    short, long = (a, b) if len(a) < len(b) else (b, a)
+    for i in range(len(long)):
+        if long[:i] + long[i + 1:] == short:
+            return True
+    return False
+
+
+def brute_force_pairs(keys):
+    return sorted(
+        tuple(sorted((a, b)))
+        for a, b in combinations(keys, 2)
+        if one_edit_apart(a, b)
+    )
+
+
+def indexed_pairs(keys):
+    by_length = defaultdict(list)
+    for key in keys:
+        by_length[len(key)].append(key)
+    return sorted(near_pairs(sorted(by_length.items())))
+
+
+def real_keys():
+    """Distinct ipa_keys norms of data/words.db (empty if it has none)"""
+    if not os.path.exists(SOURCE_DB):
+        return []
+    conn = sqlite3.connect(SOURCE_DB)
+    try:
+        has_keys = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ipa_keys'"
+        ).fetchone()
+        if not has_keys:
+            return []
+        return sorted(norm for norm, in conn.execute(
+            "SELECT DISTINCT norm FROM ipa_keys WHERE length(norm) >= ?", (NEAR_MIN_LENGTH,)
+        ))
+    finally:
+        conn.close()
+
+
+def synthetic_keys(size, rng):
+    keys = set()
+    while len(keys) < size:
+        word = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(NEAR_MIN_LENGTH, 9)))
+        keys.add(word)
+        if rng.random() < 0.3:  # Add a near neighbour
+            i = rng.randrange(len(word))
+            keys.add(word[:i] + rng.choice(ALPHABET) + word[i + 1:])
+    return sorted(keys)[:size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,2000,4000,8000,16000,32000,64000,128000")
+    parser.add_argument("--brute-max", type=int, default=4000)
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.sizes.split(",")]
+    rng = random.Random(0)
+    # One key source for every size, so the rows are comparable
+    source = real_keys()
+    if len(source) >= max(sizes):
+        print(f"Sampling from {len(source):,} ipa_keys norms in {SOURCE_DB}")
+    else:
+        source = None
+        print(f"Using synthetic keys ({SOURCE_DB} has fewer than {max(sizes):,} keys)")
+    print(f"{'keys':>8} {'pairs':>8} {'index':>10} {'brute force':>12}")
+    previous = None
+    for size in sizes:
+        keys = rng.sample(source, size) if source is not None else synthetic_keys(size, rng)
+        began = perf_counter()
+        pairs = indexed_pairs(keys)
+        index_time = perf_counter() - began
+        brute = ""
+        if size <= args.brute_max:
+            began = perf_counter()
+            expected = brute_force_pairs(keys)
+            brute = f"{(perf_counter() - began) * 1000:10.1f} ms"
+            assert pairs == expected, f"index and brute force disagree at {size} keys"
+        growth = ""
+        if previous:
+            growth = f"  (x{index_time / previous[1]:.1f} time for x{size / previous[0]:.1f} keys)"
+        print(f"{len(keys):>8,} {len(pairs):>8,} {index_time * 1000:8.1f} ms {brute:>12}{growth}")
+        previous = (size, index_time)
+    print("✓ Index matches brute force on every size it was checked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Bytes transferred per query when coincidences.db is read over HTTP Range requests.
+
+Serves the export_range_db.py output (and, for comparison, the original
+data/coincidences.db as a single file) from a local static server that
+answers Range requests, and opens each through a small SQLite VFS
+(registered with ctypes) whose reads become Range requests of
+requestChunkSize bytes, cached for the life of the connection, the way a
+virtual-file-system client in the browser works (without read-ahead).
+Every query runs on a fresh connection, so each figure is a cold start:
+the pages needed to open the database plus those the query touches.
+
+The full download (coincidences.db gzipped, what the pages fetch today)
+is measured through the same server.
+
+Usage:
+    python scripts/export_range_db.py
+    python scripts/bench_range_db.py [--export DIR] [--source DB]
+"""
+
+import argparse
+import ctypes
+import functools
+import gzip
+import http.client
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import _sqlite3
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from export_range_db import CONFIG_FILE, DB_NAME, OUTPUT_DIR, SOURCE_DB
+from key_search import search_sql
+
+VFS_NAME = "rangebench"
+RANGE_HEADER = re.compile(r"bytes=(\d+)-(\d*)$")
+
+SQLITE_OK = 0
+SQLITE_IOERR_SHORT_READ = 522
+SQLITE_IOERR_WRITE = 778
+SQLITE_NOTFOUND = 12
+SQLITE_OPEN_READONLY = 0x1
+SQLITE_OPEN_MAIN_DB = 0x100
+SQLITE_IOCAP_IMMUTABLE = 0x2000
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler that also answers single-range Range requests"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        match = RANGE_HEADER.match(self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().do_GET()
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = min(int(match.group(2) or size - 1), size - 1)
+        if start > end:
+            self.send_error(416)
+            return
+        with open(path, "rb") as handle:
+            handle.seek(start)
+            body = handle.read(end - start + 1)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RemoteDatabase:
+    """A database file read in requestChunkSize blocks over HTTP Range requests"""
+
+    def __init__(self, host, port, config):
+        self.conn = http.client.HTTPConnection(host, port)
+        self.config = config
+        self.length = config["databaseLengthBytes"]
+        self.blocks = {}
+        self.requests = 0
+        self.bytes = 0
+
+    def url(self, chunk):
+        if self.config["serverMode"] == "full":
+            return self.config["url"]
+        suffix = str(chunk).zfill(self.config["suffixLength"])
+        return self.config["urlPrefix"] + suffix
+
+    def block(self, index):
+        if index not in self.blocks:
+            size = self.config["requestChunkSize"]
+            start = index * size
+            chunk, offset = divmod(start, self.config["serverChunkSize"])
+            self.conn.request("GET", "/" + self.url(chunk), headers={
+                "Range": f"bytes={offset}-{offset + size - 1}"
+            })
+            body = self.conn.getresponse().read()
+            self.requests += 1
+            self.bytes += len(body)
+            self.blocks[index] = body
+        return self.blocks[index]
+
+    def read(self, offset, amount):
+        size = self.config["requestChunkSize"]
+        end = min(offset + amount, self.length)
+        parts = []
+        position = offset
+        while position < end:
+            index, inner = divmod(position, size)
+            data = self.block(index)[inner:inner + end - position]
+            if not data:
+                break
+            parts.append(data)
+            position += len(data)
+        return b"".join(parts)
+
+
+# --- A minimal read-only SQLite VFS over RemoteDatabase, via ctypes ---------
+
+LIB = ctypes.CDLL(_sqlite3.__file__)  # The SQLite library the sqlite3 module uses
+FILE_P = ctypes.c_void_p
+INT_P = ctypes.POINTER(ctypes.c_int)
+
+
+CFUNC = ctypes.CFUNCTYPE
+C_INT, C_INT64, C_VOID_P = ctypes.c_int, ctypes.c_int64, ctypes.c_void_p
+IO_TYPES = {
+    "xClose": CFUNC(C_INT, FILE_P),
+    "xRead": CFUNC(C_INT, FILE_P, C_VOID_P, C_INT, C_INT64),
+    "xWrite": CFUNC(C_INT, FILE_P, C_VOID_P, C_INT, C_INT64),
+    "xTruncate": CFUNC(C_INT, FILE_P, C_INT64),
+    "xSync": CFUNC(C_INT, FILE_P, C_INT),
+    "xFileSize": CFUNC(C_INT, FILE_P, ctypes.POINTER(C_INT64)),
+    "xLock": CFUNC(C_INT, FILE_P, C_INT),
+    "xUnlock": CFUNC(C_INT, FILE_P, C_INT),
+    "xCheckReservedLock": CFUNC(C_INT, FILE_P, INT_P),
+    "xFileControl": CFUNC(C_INT, FILE_P, C_INT, C_VOID_P),
+    "xSectorSize": CFUNC(C_INT, FILE_P),
+    "xDeviceCharacteristics": CFUNC(C_INT, FILE_P),
+}
+VFS_TYPES = {
+    "xOpen": CFUNC(C_INT, C_VOID_P, C_VOID_P, FILE_P, C_INT, INT_P),
+    "xDelete": CFUNC(C_INT, C_VOID_P, C_VOID_P, C_INT),
+    "xAccess": CFUNC(C_INT, C_VOID_P, C_VOID_P, C_INT, INT_P),
+    "xFullPathname": CFUNC(C_INT, C_VOID_P, C_VOID_P, C_INT, C_VOID_P),
+}
+
+
+class IoMethods(ctypes.Structure):
+    _fields_ = [("iVersion", C_INT), *IO_TYPES.items()]
+
+
+class Vfs(ctypes.Structure):
+    _fields_ = [
+        ("iVersion", C_INT),
+        ("szOsFile", C_INT),
+        ("mxPathname", C_INT),
+        ("pNext", C_VOID_P),
+        ("zName", ctypes.c_char_p),
+        ("pAppData", C_VOID_P),
+        *VFS_TYPES.items(),
+        # Everything else is the default VFS's (randomness, time, dlopen...)
+        ("rest", C_VOID_P * 12),
+    ]
+
+
+REMOTES = {}  # Database name -> RemoteDatabase, for the next open
+OPEN_FILES = {}  # sqlite3_file address -> RemoteDatabase
+LIB.sqlite3_vfs_find.restype = ctypes.POINTER(Vfs)
+LIB.sqlite3_vfs_find.argtypes = [ctypes.c_char_p]
+DEFAULT_VFS = LIB.sqlite3_vfs_find(None)
+DEFAULT_VFS_P = ctypes.cast(DEFAULT_VFS, ctypes.c_void_p)
+
+
+def remote_close(file):
+    OPEN_FILES.pop(file, None)
+    return SQLITE_OK
+
+
+def remote_read(file, buffer, amount, offset):
+    data = OPEN_FILES[file].read(offset, amount)
+    ctypes.memmove(buffer, data, len(data))
+    if len(data) < amount:
+        ctypes.memset(buffer + len(data), 0, amount - len(data))
+        return SQLITE_IOERR_SHORT_READ
+    return SQLITE_OK
+
+
+def remote_file_size(file, size):
+    size[0] = OPEN_FILES[file].length
+    return SQLITE_OK
+
+
+def remote_check_reserved_lock(file, result):
+    result[0] = 0
+    return SQLITE_OK
+
+
+IO_METHODS = IoMethods(1, **{name: IO_TYPES[name](function) for name, function in {
+    "xClose": remote_close,
+    "xRead": remote_read,
+    "xWrite": lambda file, buffer, amount, offset: SQLITE_IOERR_WRITE,
+    "xTruncate": lambda file, size: SQLITE_OK,
+    "xSync": lambda file, flags: SQLITE_OK,
+    "xFileSize": remote_file_size,
+    "xLock": lambda file, level: SQLITE_OK,
+    "xUnlock": lambda file, level: SQLITE_OK,
+    "xCheckReservedLock": remote_check_reserved_lock,
+    "xFileControl": lambda file, op, arg: SQLITE_NOTFOUND,
+    "xSectorSize": lambda file: 512,
+    "xDeviceCharacteristics": lambda file: SQLITE_IOCAP_IMMUTABLE,
+}.items()})
+
+
+def vfs_name(pointer):
+    return ctypes.string_at(pointer).decode("utf-8") if pointer else None
+
+
+def vfs_open(vfs, name, file, flags, out_flags):
+    remote = REMOTES.get(vfs_name(name))
+    if remote is None or not flags & SQLITE_OPEN_MAIN_DB:
+        # Temporary files (sorting, materialized subqueries) stay local
+        return DEFAULT_VFS.contents.xOpen(DEFAULT_VFS_P, name, file, flags, out_flags)
+    ctypes.cast(file, ctypes.POINTER(ctypes.c_void_p))[0] = ctypes.addressof(IO_METHODS)
+    OPEN_FILES[file] = remote
+    if out_flags:
+        out_flags[0] = SQLITE_OPEN_READONLY
+    return SQLITE_OK
+
+
+def vfs_access(vfs, name, flags, result):
+    text = vfs_name(name)
+    if text in REMOTES or any(text.startswith(remote + "-") for remote in REMOTES):
+        result[0] = int(text in REMOTES)
+        return SQLITE_OK
+    return DEFAULT_VFS.contents.xAccess(DEFAULT_VFS_P, name, flags, result)
+
+
+def vfs_full_pathname(vfs, name, size, out):
+    text = vfs_name(name)
+    if text in REMOTES:
+        encoded = text.encode("utf-8")[:size - 1] + b"\0"
+        ctypes.memmove(out, encoded, len(encoded))
+        return SQLITE_OK
+    return DEFAULT_VFS.contents.xFullPathname(DEFAULT_VFS_P, name, size, out)
+
+
+def register_vfs():
+    vfs = Vfs()
+    ctypes.memmove(ctypes.byref(vfs), DEFAULT_VFS, ctypes.sizeof(Vfs))
+    vfs.pNext = None
+    vfs.zName = VFS_NAME.encode()
+    vfs.xOpen = VFS_TYPES["xOpen"](vfs_open)
+    vfs.xAccess = VFS_TYPES["xAccess"](vfs_access)
+    vfs.xFullPathname = VFS_TYPES["xFullPathname"](vfs_full_pathname)
+    LIB.sqlite3_vfs_register(ctypes.byref(vfs), 0)
+    return vfs
+
+
+VFS = register_vfs()
+
+
+def measure(host, port, name, config, sql, params):
+    """Run one query on a cold connection; return (rows, requests, bytes)"""
+    remote = RemoteDatabase(host, port, config)
+    REMOTES[name] = remote
+    conn = sqlite3.connect(f"file:{name}?vfs={VFS_NAME}&immutable=1", uri=True)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+        del REMOTES[name]
+        remote.conn.close()
+    return len(rows), remote.requests, remote.bytes
+
+
+def sample_queries(conn):
+    """(label, sql, params) for the query shapes of search.js, with inputs from conn"""
+    spelling = [key for key, in conn.execute(
+        "SELECT match_key FROM spelling_matches WHERE length(match_key) >= 6 ORDER BY languages DESC, match_key LIMIT 50"
+    )]
+    pronunciation = [key for key, in conn.execute(
+        "SELECT match_key FROM pronunciation_matches WHERE length(match_key) >= 5 ORDER BY languages DESC, match_key LIMIT 50"
+    )]
+    languages = [lang for lang, in conn.execute("SELECT lang FROM language_stats ORDER BY rank")]
+    queries = [("language list", "SELECT lang, total FROM language_stats ORDER BY rank", [])]
+    if spelling:
+        word = spelling[len(spelling) // 2]
+        for query in (word[:2], word[1:4], word[:5]):
+            queries.append((f"search spelling '{query}'", *search_sql("spelling_matches", query)))
+        # Without match_key_grams: rank on the (covering) key index, then fetch the entries
+        queries.append((
+            f"search spelling '{word[1:4]}' (LIKE)",
+            """
+            SELECT match_key, languages, gloss_overlap, entries FROM spelling_matches
+            WHERE id IN (
+                SELECT id FROM spelling_matches WHERE match_key LIKE ?
+                ORDER BY languages DESC LIMIT 100
+            )
+            ORDER BY languages DESC
+            """,
+            [f"%{word[1:4]}%"],
+        ))
+        queries.append((
+            f"exact key '{word}'",
+            "SELECT match_key, languages, gloss_overlap, entries FROM spelling_matches WHERE match_key = ?",
+            [word],
+        ))
+    if pronunciation:
+        key = pronunciation[len(pronunciation) // 2]
+        queries.append((f"search pronunciation '{key[:3]}'", *search_sql("pronunciation_matches", key[:3])))
+    if len(languages) >= 2:
+        pair = languages[len(languages) // 2 - 1:len(languages) // 2 + 1]
+        lang_ids = "SELECT id FROM languages WHERE lang IN (?, ?)"
+        queries.append((
+            f"explore {pair[0]} + {pair[1]}",
+            f"""
+            SELECT id, match_key, entries FROM spelling_matches
+            WHERE id IN (
+                SELECT match_id FROM language_pair_matches
+                WHERE lang_a_id IN ({lang_ids}) AND lang_b_id IN ({lang_ids}) AND kind = 'spelling'
+            )
+            ORDER BY id
+            """,
+            [*pair, *pair],
+        ))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--export", default=OUTPUT_DIR, help=f"export_range_db.py output (default: {OUTPUT_DIR})")
+    parser.add_argument("--source", default=SOURCE_DB, help=f"Original database (default: {SOURCE_DB})")
+    args = parser.parse_args()
+    config_path = os.path.join(args.export, CONFIG_FILE)
+    if not os.path.exists(config_path):
+        raise SystemExit(f"Missing {config_path}; run export_range_db.py first")
+    with open(config_path, encoding="utf-8") as handle:
+        export_config = json.load(handle)
+
+    with tempfile.TemporaryDirectory() as root:
+        for name in os.listdir(args.export):
+            os.symlink(os.path.abspath(os.path.join(args.export, name)), os.path.join(root, name))
+        os.symlink(os.path.abspath(args.source), os.path.join(root, "source.db"))
+        with open(args.source, "rb") as src, gzip.open(os.path.join(root, "source.db.gz"), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        source_conn = sqlite3.connect(args.source)
+        page_size = source_conn.execute("PRAGMA page_size").fetchone()[0]
+        source_conn.close()
+        source_config = {
+            "serverMode": "full",
+            "url": "source.db",
+            "requestChunkSize": page_size,
+            "databaseLengthBytes": os.path.getsize(args.source),
+            "serverChunkSize": os.path.getsize(args.source),
+        }
+
+        handler = functools.partial(RangeRequestHandler, directory=root)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            download = http.client.HTTPConnection(host, port)
+            download.request("GET", "/source.db.gz")
+            full_bytes = len(download.getresponse().read())
+            download.close()
+
+            export_conn = sqlite3.connect(os.path.join(args.export, DB_NAME))
+            queries = sample_queries(export_conn)
+            export_conn.close()
+            print(f"Full download (gzipped {os.path.basename(args.source)}): {full_bytes / 1024:,.0f} KB")
+            print(f"Range requests: original layout ({page_size}-byte pages) vs export "
+                  f"({export_config['requestChunkSize']}-byte pages), cold cache per query")
+            print(f"{'query':<44} {'rows':>5} {'original':>18} {'export':>18} {'of full':>8}")
+            for label, sql, params in queries:
+                rows, requests, sent = measure(host, port, "source", source_config, sql, params)
+                export_rows, export_requests, export_sent = measure(host, port, "export", export_config, sql, params)
+                assert rows == export_rows, f"{label}: {rows} rows vs {export_rows} rows in the export"
+                print(f"{label[:44]:<44} {rows:>5} {sent / 1024:>8.0f} KB ({requests:>4}) "
+                      f"{export_sent / 1024:>8.0f} KB ({export_requests:>4}) {export_sent / full_bytes:>7.1%}")
+        finally:
+            server.shutdown()
+            server.server_close()
+    print("(requests in parentheses; 'of full' compares the export with the full download)")
+
+
+if __name__ == "__main__":
+    main()
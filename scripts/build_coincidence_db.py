@@ -14,12 +14,10 @@ Filtering criteria (to emphasize accidental matches, not loanwords/related roots
 - Remove entries whose primary gloss contains "alternative form of".
 - Remove non-English entries whose gloss is just the English word within the same group.
 - Remove entries whose language is Translingual.
-- Remove any group containing a language pair listed in lexical_similarity.csv
-  (language names are case-insensitive, parsed from the repo root).
-  -This filter is currently disabled as it was too aggressive, removing all matches 
-   for groups with ANY excluded language pair, even when other languages had 
-   completely different meanings. A refined approach is needed to remove only 
-   specific language pairs instead of entire groups. To be continued. 
+- Remove entries whose language is closely related to an earlier entry's language
+  in the same group, per the pairs in lexical_similarity.csv (language names are
+  case-insensitive, parsed from the repo root). Only the later entry of each
+  related pair is dropped, not the whole group (see language_pairs.py).
 - Remove hyphenated words from spelling-only matches (keep only if they also
   appear in pronunciation matches).
 - Remove Latin-script words longer than 9 letters (likely to be etymologically related).
@@ -33,127 +31,96 @@ Filtering criteria (to emphasize accidental matches, not loanwords/related roots
 - IPA normalization is applied to group pronunciation matches.
 """
 
+import argparse
+import hashlib
 import json
+import multiprocessing
 import os
-import re
+import pickle
 import sqlite3
-from itertools import combinations
+from collections import Counter, OrderedDict, deque
+from itertools import chain
+
+from bulk_load import BulkWriter, remove_db_files
+from ipa_keys import ensure_ipa_keys, ipa_variants, normalize_ipa
+from entry_filters import (
+    GLOSS_PARTS_SPLIT,
+    FilterEngine,
+    filter_config,
+    normalize_for_comparison,
+)
+from gloss_overlap import STOP_WORDS, TOKEN_PATTERN, TokenInterner, average_overlaps
+from group_cache import CACHE_MB, GroupCache, group_digest
+from key_search import GRAM_TABLE, INSERT_GRAM, gram_rows
+from language_pairs import RelatedLanguages
+from match_entries import (
+    ENTRY_INDEXES,
+    ENTRY_TABLES,
+    FILL_LANGUAGE_PAIRS,
+    FILL_LANGUAGE_STATS,
+    FILL_MATCH_LINKS,
+    INSERT_ENTRY,
+    INSERT_LANGUAGE,
+    LANGUAGE_PAIRS_TABLE,
+    LANGUAGE_STATS_TABLE,
+    MATCH_KINDS,
+    MATCH_LINKS_TABLE,
+    MatchEntries,
+)
+from near_ipa import NEAR_MIN_LENGTH, near_pairs
+from transliterate import ensure_translit, translit_key
 
 SOURCE_DB = "data/words.db"
 TARGET_DB = "data/coincidences.db"
+SPELLING_STAGING = "data/coincidences_spelling.db"  # Spelling phase output, merged into TARGET_DB
+CHANGES_FILE = "data/words_changes.jsonl"  # Written by rebuild_words_db.py --update
+CACHE_FILE = "data/coincidence_cache.db"  # Reduced groups from earlier runs (see group_cache.py)
 LEXICAL_SIMILARITY_CSV = "lexical_similarity.csv"
 GLOSS_THRESHOLD = 0.10  # Lowered from 0.35->0.15->0.10 to filter words with even minimal semantic overlap
 MIN_LANGS = 2
 BATCH_LIMIT = 10000
+GROUP_BATCH = 2000  # Groups per task sent to a worker process
+NEAR_MEMO_ENTRIES = 100000  # Entries of recently used IPA keys kept by the near stage
+MAX_GLOSSES = 5  # Glosses kept per language by reduce_entries
+ABBREVIATION_PREFIXES = ("initialism of", "acronym of", "abbreviation of")
 
-ALLOWED_WORD_CHARS = set("-'")
-
-# Common English stop words that don't indicate semantic similarity
-STOP_WORDS = {
-    'the', 'and', 'for', 'are', 'was', 'were', 'has', 'have', 'had',
-    'with', 'from', 'that', 'this', 'these', 'those', 'than', 'then',
-    'such', 'when', 'where', 'what', 'which', 'who', 'whom', 'whose',
-    'been', 'being', 'does', 'did', 'will', 'would', 'could', 'should',
-    'may', 'might', 'must', 'can', 'its', 'not', 'but', 'all', 'any',
-    'some', 'each', 'every', 'both', 'few', 'more', 'most', 'other',
-    'into', 'through', 'during', 'before', 'after', 'above', 'below',
-    'between', 'under', 'again', 'further', 'once', 'here', 'there',
-    'also', 'only', 'own', 'same', 'very', 'just', 'now', 'used'
-}
-
-def tokenize_gloss(text):
-    if not text:
-        return set()
-    tokens = re.findall(r"[a-zA-Z]+", text.lower())
-    return {t for t in tokens if len(t) > 2 and t not in STOP_WORDS}
-
-def has_disallowed_punctuation(word):
-    if not word:
-        return True
-    import unicodedata
-    for ch in word:
-        # Allow alphanumeric, allowed word chars, and combining/mark characters (diacritics, viramas, etc.)
-        if ch.isalnum() or ch in ALLOWED_WORD_CHARS or unicodedata.category(ch).startswith('M'):
-            continue
-        return True
-    return False
+# Compiled filter rules (see entry_filters.py). ROW_FILTERS run on every
+# source row before grouping; the others run per group in filter_entries.
+ROW_FILTERS = FilterEngine(["punctuation", "multiword"])
+WORD_FILTERS = FilterEngine(["punctuation", "multiword", "long_latin"])
+ENTRY_FILTERS = FilterEngine(["translingual", "alternative_form", "self_referential"])
+FILTER_STATS = Counter()  # Rejections and seconds per rule, for the final report
+GLOSS_TOKENS = TokenInterner()  # Token IDs per gloss string (see gloss_overlap.py)
+MATCH_ENTRIES = MatchEntries()  # Match and language ids for coincidence_entries (see match_entries.py)
 
-def is_multiword(word):
-    if not word:
-        return True
-    return any(ch.isspace() for ch in word)
+# Bump when the code of filter_entries or reduce_entries changes what they
+# keep, so cached groups are recomputed. Changes to their constants are
+# picked up by cache_version().
+REDUCE_VERSION = 1
+
+def cache_version():
+    """Hash of every setting a cached group depends on (see group_cache.py)"""
+    config = {
+        "filters": filter_config(),
+        "reduce_version": REDUCE_VERSION,
+        "word_filters": WORD_FILTERS.names,
+        "entry_filters": ENTRY_FILTERS.names,
+        "stop_words": sorted(STOP_WORDS),
+        "token_pattern": TOKEN_PATTERN.pattern,
+        "max_glosses": MAX_GLOSSES,
+        "abbreviation_prefixes": list(ABBREVIATION_PREFIXES),
+        "min_langs": MIN_LANGS,
+    }
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
 def has_hyphen(word):
     if not word:
         return False
     return "-" in word
 
-def is_latin_script(word):
-    """Check if a word is primarily written in Latin script."""
-    if not word:
-        return False
-    # Count Latin characters (a-z, A-Z, and common diacritics)
-    latin_chars = sum(1 for ch in word if ord(ch) < 0x0370 and (ch.isalpha() or ch in ALLOWED_WORD_CHARS))
-    total_chars = len([ch for ch in word if ch.isalpha() or ch in ALLOWED_WORD_CHARS])
-    # If more than 50% of characters are Latin script, consider it Latin
-    return total_chars > 0 and (latin_chars / total_chars) > 0.5
-
-def normalize_language(lang):
-    if not lang:
-        return ""
-    return " ".join(lang.strip().lower().split())
-
 def load_lexical_similarity_pairs():
-    # DISABLED: This filter was too aggressive, rejecting entire word groups
-    # if ANY pair of languages was excluded, even when other languages had
-    # completely different meanings.
-    # TODO: Refine to remove only specific language pairs instead of entire groups
-    return set()
-    
-    # Original implementation (commented out):
-    # pairs = set()
-    # if not os.path.exists(LEXICAL_SIMILARITY_CSV):
-    #     return pairs
-    # with open(LEXICAL_SIMILARITY_CSV, "r", encoding="utf-8") as handle:
-    #     for line in handle:
-    #         raw = line.strip()
-    #         if not raw or raw.startswith("#"):
-    #             continue
-    #         parts = [normalize_language(p) for p in raw.split(",") if p.strip()]
-    #         if len(parts) != 2:
-    #             continue
-    #         if not parts[0] or not parts[1]:
-    #             continue
-    #         pairs.add(frozenset(parts))
-    # return pairs
-
-def has_excluded_language_pair(entries, excluded_pairs):
-    if not excluded_pairs:
-        return False
-    langs = [
-        normalize_language(entry.get("lang"))
-        for entry in entries
-        if entry.get("lang")
-    ]
-    if len(langs) < 2:
-        return False
-    for left, right in combinations(langs, 2):
-        if frozenset((left, right)) in excluded_pairs:
-            return True
-    return False
-
-def normalize_for_comparison(text):
-    if not text:
-        return ""
-    text = re.sub(r"\([^)]*\)", " ", text)
-    return "".join(ch for ch in text.lower() if ch.isalpha())
-
-def is_alternative_form_gloss(entry):
-    glosses = (entry.get("glosses") or "").strip()
-    if not glosses:
-        return False
-    primary = re.split(r"[;|/]", glosses, maxsplit=1)[0].strip().lower()
-    return "alternative form of" in primary
+    return RelatedLanguages.from_csv(LEXICAL_SIMILARITY_CSV)
 
 def is_english_self_gloss(entry, english_words_norm):
     if entry.get("lang") == "English":
@@ -161,36 +128,16 @@ def is_english_self_gloss(entry, english_words_norm):
     glosses = (entry.get("glosses") or "").strip()
     if not glosses or not english_words_norm:
         return False
-    parts = re.split(r"[;|/,]", glosses)
-    for part in parts:
+    for part in GLOSS_PARTS_SPLIT.split(glosses):
         if normalize_for_comparison(part) in english_words_norm:
             return True
     return False
 
-def is_self_referential_gloss(entry):
-    """Check if the gloss is just the word itself (e.g., Spanish word 'hola' with gloss 'hola')."""
-    word = (entry.get("word") or "").strip()
-    glosses = (entry.get("glosses") or "").strip()
-    if not word or not glosses:
-        return False
-    word_norm = normalize_for_comparison(word)
-    parts = re.split(r"[;|/,]", glosses)
-    # Check if any gloss part is just the word itself
-    for part in parts:
-        part_norm = normalize_for_comparison(part)
-        if part_norm == word_norm:
-            return True
-    return False
-
-def filter_entries(entries):
+def filter_entries(entries, stats=FILTER_STATS):
     filtered = [
         e for e in entries
-        if not has_disallowed_punctuation(e.get("word", ""))
-        and not is_multiword(e.get("word", ""))
-        and not is_alternative_form_gloss(e)
-        and not is_self_referential_gloss(e)
-        and normalize_language(e.get("lang")) != "translingual"
-        and (not is_latin_script(e.get("word", "")) or len(e.get("word", "")) <= 9)
+        if WORD_FILTERS.check(e.get("word", ""), stats) is None
+        and ENTRY_FILTERS.check(e, stats) is None
     ]
     english_words_norm = {
         normalize_for_comparison(e.get("word", ""))
@@ -198,92 +145,67 @@ def filter_entries(entries):
         if e.get("lang") == "English"
     }
     if english_words_norm:
-        filtered = [
+        kept = [
             e for e in filtered if not is_english_self_gloss(e, english_words_norm)
         ]
+        stats["english_self_gloss"] += len(filtered) - len(kept)
+        filtered = kept
     return filtered
 
-def gloss_distance(entries):
-    overlaps = []
-    for left, right in combinations(entries, 2):
-        if not left["tokens"] or not right["tokens"]:
-            continue
-        inter = len(left["tokens"] & right["tokens"])
-        union = len(left["tokens"] | right["tokens"])
-        if union == 0:
-            continue
-        overlaps.append(inter / union)
-    if not overlaps:
-        return 0.0  # No overlap means different meanings
-    return sum(overlaps) / len(overlaps)  # Average overlap instead of max
-
-IPA_STRIP = re.compile(r"[\[\]/ˈˌ\s]")
-IPA_MAP = {
-    "ɡ": "g",
-    "θ": "th",
-    "ð": "th",
-    "ʃ": "sh",
-    "ʒ": "zh",
-    "ŋ": "ng",
-    "ɲ": "ny",
-    "ʧ": "ch",
-    "ʤ": "j",
-    "ɑ": "a",
-    "ɒ": "a",
-    "æ": "a",
-    "ʌ": "a",
-    "ɔ": "o",
-    "ɜ": "e",
-    "ə": "e",
-    "ɪ": "i",
-    "ʊ": "u",
-    "ɹ": "r",  # American English r
-    "ɾ": "r",  # Alveolar tap (Spanish/Turkish r)
-    "ʁ": "r",  # French/German r
-    "ʀ": "r",  # Uvular trill
-}
-
-def normalize_ipa(ipa):
-    if not ipa:
-        return ""
-    ipa = ipa.lower()
-    for src, dest in IPA_MAP.items():
-        ipa = ipa.replace(src, dest)
-    ipa = IPA_STRIP.sub("", ipa)
-    ipa = ipa.replace("ː", "")
-    return ipa
+MATCH_TABLES = [
+    """
+    CREATE TABLE spelling_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_key TEXT NOT NULL,
+        languages INTEGER NOT NULL,
+        gloss_overlap REAL NOT NULL,
+        entries TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE pronunciation_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_key TEXT NOT NULL,
+        languages INTEGER NOT NULL,
+        gloss_overlap REAL NOT NULL,
+        entries TEXT NOT NULL
+    )
+    """,
+    # Spelling matches grouped on words.translit, with at least two distinct words
+    """
+    CREATE TABLE transliterated_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_key TEXT NOT NULL,
+        languages INTEGER NOT NULL,
+        gloss_overlap REAL NOT NULL,
+        entries TEXT NOT NULL
+    )
+    """,
+    # Filled by process_near_pronunciation (--near); match_key < near_key
+    """
+    CREATE TABLE near_pronunciation_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_key TEXT NOT NULL,
+        near_key TEXT NOT NULL,
+        distance INTEGER NOT NULL,
+        languages INTEGER NOT NULL,
+        gloss_overlap REAL NOT NULL,
+        entries TEXT NOT NULL
+    )
+    """,
+]
+MATCH_INDEXES = [
+    "CREATE INDEX idx_spelling_key ON spelling_matches(match_key)",
+    "CREATE INDEX idx_pron_key ON pronunciation_matches(match_key)",
+    "CREATE INDEX idx_translit_key ON transliterated_matches(match_key)",
+    "CREATE INDEX idx_near_key ON near_pronunciation_matches(match_key)",
+    "CREATE INDEX idx_near_near_key ON near_pronunciation_matches(near_key)",
+]
 
 def init_target_db():
+    """Start a bulk load of TARGET_DB; it replaces the old file on finish()"""
     os.makedirs("data", exist_ok=True)
-    if os.path.exists(TARGET_DB):
-        os.remove(TARGET_DB)
-    conn = sqlite3.connect(TARGET_DB)
-    conn.execute(
-        """
-        CREATE TABLE spelling_matches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            match_key TEXT NOT NULL,
-            languages INTEGER NOT NULL,
-            gloss_overlap REAL NOT NULL,
-            entries TEXT NOT NULL
-        )
-        """
-    )
-    conn.execute(
-        """
-        CREATE TABLE pronunciation_matches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            match_key TEXT NOT NULL,
-            languages INTEGER NOT NULL,
-            gloss_overlap REAL NOT NULL,
-            entries TEXT NOT NULL
-        )
-        """
-    )
-    conn.execute("CREATE INDEX idx_spelling_key ON spelling_matches(match_key)")
-    conn.execute("CREATE INDEX idx_pron_key ON pronunciation_matches(match_key)")
-    conn.commit()
-    return conn
+    return BulkWriter(TARGET_DB, tables=MATCH_TABLES + ENTRY_TABLES + [LANGUAGE_STATS_TABLE, LANGUAGE_PAIRS_TABLE, MATCH_LINKS_TABLE, GRAM_TABLE], indexes=MATCH_INDEXES + ENTRY_INDEXES)
 
 def reduce_entries(entries):
     combined = {}
@@ -296,7 +218,6 @@ def reduce_entries(entries):
                 "lang_code": row["lang_code"],
                 "ipa": row["ipa"],
                 "glosses": [],
-                "tokens": set(),
             }
         if row["glosses"]:
             # Split glosses by | and add each one
@@ -319,11 +240,7 @@ def reduce_entries(entries):
         # but always keep the first gloss if it's an initialism/acronym/abbreviation
         keep_glosses = []
         for i, g in enumerate(deduped):
-            is_abbrev = (
-                g.lower().startswith("initialism of")
-                or g.lower().startswith("acronym of")
-                or g.lower().startswith("abbreviation of")
-            )
+            is_abbrev = g.lower().startswith(ABBREVIATION_PREFIXES)
             if i == 0:
                 # Always keep the first gloss, regardless
                 keep_glosses.append(g)
@@ -332,42 +249,209 @@ def reduce_entries(entries):
                 keep_glosses.append(g)
             # Skip subsequent initialism/acronym/abbreviation glosses
 
-        # Limit to 5 glosses max per language
-        keep_glosses = keep_glosses[:5]
+        # Limit to MAX_GLOSSES per language
+        keep_glosses = keep_glosses[:MAX_GLOSSES]
 
         gloss_text = " | ".join(keep_glosses)
         if not gloss_text.strip():
             continue
         data["glosses"] = gloss_text
         # Rebuild tokens from the kept glosses
-        data["tokens"] = set()
-        for g in keep_glosses:
-            data["tokens"].update(tokenize_gloss(g))
+        data["tokens"] = GLOSS_TOKENS.ids(keep_glosses)
         reduced.append(data)
     return reduced
 
-def save_match(cursor, table, key, entries, overlap):
+def match_row(key, entries, overlap):
+    """The (match_key, languages, gloss_overlap, entries) row for a match"""
     payload = [
         {k: entry[k] for k in ("word", "lang", "lang_code", "ipa", "glosses")}
         for entry in entries
     ]
-    cursor.execute(
-        f"INSERT INTO {table} (match_key, languages, gloss_overlap, entries) VALUES (?, ?, ?, ?)",
-        (key, len(entries), overlap, json.dumps(payload, ensure_ascii=False))
-    )
+    return (key, len(entries), overlap, json.dumps(payload, ensure_ascii=False))
 
-def process_spelling(source_conn, target_conn, pronunciation_words=None, excluded_pairs=None):
-    cursor = source_conn.execute(
-        "SELECT word, lang, lang_code, ipa, glosses FROM words WHERE word != '' ORDER BY word"
+def save_match(writer, table, row):
+    """Queue a match row and its coincidence_entries and match_key_grams rows"""
+    match_id = MATCH_ENTRIES.next_id(table)
+    writer.insert(
+        f"INSERT INTO {table} (id, match_key, languages, gloss_overlap, entries) VALUES (?, ?, ?, ?, ?)",
+        (match_id, *row)
     )
-    target_cursor = target_conn.cursor()
+    writer.insert_many(INSERT_ENTRY, MATCH_ENTRIES.rows(table, match_id, row[-1]))
+    writer.insert_many(INSERT_GRAM, gram_rows(table, match_id, row[0]))
+
+def save_languages(writer):
+    """Write the interned languages and the tables derived from coincidence_entries"""
+    writer.insert_many(INSERT_LANGUAGE, MATCH_ENTRIES.take_languages())
+    writer.execute(FILL_LANGUAGE_STATS)
+    writer.execute(FILL_LANGUAGE_PAIRS)
+    writer.execute(FILL_MATCH_LINKS)
+
+def reduce_group(entries, stats=FILTER_STATS):
+    return reduce_entries(filter_entries(entries, stats))
+
+def cache_value(reduced, stats):
+    """Serialize a reduce_group result and its filter counts for GroupCache"""
+    entries = [
+        (e["word"], e["lang"], e["lang_code"], e["ipa"], e["glosses"], GLOSS_TOKENS.names(e["tokens"]))
+        for e in reduced
+    ]
+    counts = {name: count for name, count in stats.items() if not name.endswith("_seconds")}
+    return pickle.dumps((entries, counts), pickle.HIGHEST_PROTOCOL)
+
+def cached_group(value, stats):
+    """The reduce_group result stored by cache_value; replays its filter counts"""
+    entries, counts = pickle.loads(value)
+    stats.update(counts)
+    return [
+        {
+            "word": word,
+            "lang": lang,
+            "lang_code": lang_code,
+            "ipa": ipa,
+            "glosses": glosses,
+            "tokens": GLOSS_TOKENS.token_set(tokens),
+        }
+        for word, lang, lang_code, ipa, glosses, tokens in entries
+    ]
+
+def evaluate_batch(batch):
+    """Worker entry point: evaluate one (groups, excluded_pairs) batch.
+    
+    groups are (key, entries, cached) where cached is the GroupCache value
+    for a cache hit, True for a miss that should be cached, or None.
+    excluded_pairs (RelatedLanguages or None) prunes related-language
+    entries after the cached reduction, so the cache does not depend on it.
+    
+    Returns, for every group in order, (row, words) if it is kept, where
+    row is its match_row and words are the words of its entries, or None
+    if it is dropped; the filter counters for the batch; and the new cache
+    value for each miss (None for the other groups). The kept groups'
+    gloss overlaps are passed to average_overlaps in one call, but each
+    group is scored on its own.
+    """
+    groups, excluded_pairs = batch
+    stats = Counter()
+    reduced_groups = []
+    fresh = []
+    for _, entries, cached in groups:
+        if cached is None:
+            reduced = reduce_group(entries, stats)
+            fresh.append(None)
+        elif cached is True:
+            group_stats = Counter()
+            reduced = reduce_group(entries, group_stats)
+            stats.update(group_stats)
+            fresh.append(cache_value(reduced, group_stats))
+        else:
+            reduced = cached_group(cached, stats)
+            fresh.append(None)
+        if excluded_pairs is not None:
+            reduced = excluded_pairs.prune(reduced, stats)
+        if len(reduced) < MIN_LANGS:
+            reduced = None
+        reduced_groups.append(reduced)
+    overlaps = iter(average_overlaps([
+        [entry["tokens"] for entry in reduced]
+        for reduced in reduced_groups
+        if reduced is not None
+    ]))
+    results = []
+    for (key, _, _), reduced in zip(groups, reduced_groups):
+        overlap = next(overlaps) if reduced is not None else None
+        if reduced is None or overlap >= GLOSS_THRESHOLD:
+            results.append(None)
+            continue
+        words = [entry["word"] for entry in reduced if entry.get("word")]
+        results.append((match_row(key, reduced, overlap), words))
+    return results, stats, fresh
+
+def evaluate_groups(groups, pool=None, workers=1, excluded_pairs=None, cache=None, stats=FILTER_STATS):
+    """Yield (key, result) for a stream of (key, entries) groups, in order.
+    
+    With a pool, batches of GROUP_BATCH groups are evaluated in the worker
+    processes, keeping a bounded window in flight. Results come back in
+    input order either way, so the writer inserts the same rows in the same
+    order as a single-process run and the output file is identical.
+    
+    With a cache, groups that have at least MIN_LANGS languages are looked
+    up by group_digest first; hits skip filtering and reduction, and misses
+    are stored once evaluated. Filter counts are added to stats.
+    """
+    version = cache_version() if cache is not None else None
+    
+    def batches():
+        batch = []
+        for group in groups:
+            batch.append(group)
+            if len(batch) >= GROUP_BATCH:
+                yield lookup(batch)
+                batch = []
+        if batch:
+            yield lookup(batch)
+    
+    def lookup(batch):
+        if cache is None:
+            return [(key, entries, None) for key, entries in batch], None
+        digests = [
+            group_digest(entries, version)
+            if len({entry["lang"] for entry in entries}) >= MIN_LANGS else None
+            for _, entries in batch
+        ]
+        found = cache.lookup(digests)
+        return [
+            (key, entries, found.get(digest, True) if digest is not None else None)
+            for (key, entries), digest in zip(batch, digests)
+        ], digests
+    
+    def collect(batch, digests, done):
+        results, batch_stats, fresh = done
+        stats.update(batch_stats)
+        if cache is not None:
+            cache.store([
+                (digest, value)
+                for digest, value in zip(digests, fresh)
+                if value is not None
+            ])
+        for (key, _, _), result in zip(batch, results):
+            yield key, result
+    
+    if pool is None:
+        for batch, digests in batches():
+            yield from collect(batch, digests, evaluate_batch((batch, excluded_pairs)))
+        return
+    pending = deque()
+    for batch, digests in batches():
+        task = pool.apply_async(evaluate_batch, ((batch, excluded_pairs),))
+        pending.append((batch, digests, task))
+        if len(pending) >= workers * 2:
+            batch, digests, task = pending.popleft()
+            yield from collect(batch, digests, task.get())
+    while pending:
+        batch, digests, task = pending.popleft()
+        yield from collect(batch, digests, task.get())
+
+def spelling_groups(source_conn, counts, words=None):
+    """Yield (word, entries) groups from words.db, in word order.
+    
+    words limits the scan to those spelling keys (see update_coincidences).
+    """
+    if words is None:
+        cursor = source_conn.execute(
+            "SELECT word, lang, lang_code, ipa, glosses FROM words WHERE word != '' ORDER BY word"
+        )
+    else:
+        cursor = chain.from_iterable(
+            source_conn.execute(
+                "SELECT word, lang, lang_code, ipa, glosses FROM words WHERE word = ? ORDER BY word",
+                (word,)
+            )
+            for word in sorted(words) if word
+        )
     current_word = None
     bucket = []
-    saved = 0
-    rows = 0
     for row in cursor:
         word = row[0]
-        if has_disallowed_punctuation(word) or is_multiword(word):
+        if ROW_FILTERS.check(word, FILTER_STATS, prefix="row_"):
             continue
         entry = {
             "word": word,
@@ -377,151 +461,692 @@ def process_spelling(source_conn, target_conn, pronunciation_words=None, exclude
             "glosses": row[4] or "",
         }
         if word != current_word and current_word is not None:
-            saved += handle_spelling_group(
-                current_word,
-                bucket,
-                target_cursor,
-                pronunciation_words=pronunciation_words,
-                excluded_pairs=excluded_pairs,
-            )
+            yield current_word, bucket
             bucket = []
         bucket.append(entry)
         current_word = word
-        rows += 1
-        if rows % 500000 == 0:
-            print(f"[spelling] scanned {rows:,} rows, saved {saved:,} groups")
+        counts["rows"] += 1
     if bucket:
-        saved += handle_spelling_group(
-            current_word,
-            bucket,
-            target_cursor,
-            pronunciation_words=pronunciation_words,
-            excluded_pairs=excluded_pairs,
-        )
-    target_conn.commit()
-    print(f"[spelling] complete: {saved:,} coincidence sets")
+        yield current_word, bucket
 
+def kept_spelling_groups(source_conn, pool=None, workers=1, excluded_pairs=None, cache=None):
+    """Yield (word, row) for each spelling group that passes evaluation"""
+    counts = Counter()
+    kept = 0
+    reported = 0
+    groups = spelling_groups(source_conn, counts)
+    for word, result in evaluate_groups(groups, pool, workers, excluded_pairs, cache):
+        if counts["rows"] // 500000 > reported:
+            reported = counts["rows"] // 500000
+            print(f"[spelling] scanned {counts['rows']:,} rows, kept {kept:,} groups")
+        if result is None:
+            continue
+        kept += 1
+        yield word, result[0]
 
-def handle_spelling_group(word, entries, cursor, pronunciation_words=None, excluded_pairs=None):
-    entries = filter_entries(entries)
-    reduced = reduce_entries(entries)
-    if len(reduced) < MIN_LANGS:
-        return 0
-    if has_excluded_language_pair(reduced, excluded_pairs or set()):
-        return 0
-    if has_hyphen(word) and pronunciation_words is not None:
-        if word not in pronunciation_words:
-            return 0
-    overlap = gloss_distance(reduced)
-    if overlap >= GLOSS_THRESHOLD:
-        return 0
-    save_match(cursor, "spelling_matches", word, reduced, overlap)
-    return 1
-
-def process_pronunciation(source_conn, target_conn, excluded_pairs=None):
-    cursor = source_conn.execute(
-        "SELECT ipa, word, lang, lang_code, glosses FROM words WHERE ipa IS NOT NULL AND ipa != '' ORDER BY ipa"
+def process_spelling(
+    source_conn,
+    writer,
+    pronunciation_words=None,
+    excluded_pairs=None,
+    pool=None,
+    workers=1,
+    cache=None,
+):
+    saved = 0
+    for word, row in kept_spelling_groups(source_conn, pool, workers, excluded_pairs, cache):
+        # Hyphenated words only count if they also have a pronunciation match
+        if has_hyphen(word) and pronunciation_words is not None:
+            if word not in pronunciation_words:
+                continue
+        save_match(writer, "spelling_matches", row)
+        saved += 1
+    writer.flush()
+    print(f"[spelling] complete: {saved:,} coincidence sets")
+
+SPELLING_STAGING_TABLES = [
+    """
+    CREATE TABLE spelling_staging (
+        match_key TEXT NOT NULL,
+        languages INTEGER NOT NULL,
+        gloss_overlap REAL NOT NULL,
+        entries TEXT NOT NULL,
+        held INTEGER NOT NULL
     )
-    target_cursor = target_conn.cursor()
+    """,
+    "CREATE TABLE spelling_stats (stats TEXT NOT NULL)",
+]
+
+def spelling_phase(staging_path, workers=1, excluded_pairs=None, cache_mb=None):
+    """Process entry point: evaluate the spelling groups into a staging DB.
+    
+    Runs alongside process_pronunciation in the parent. Whether a
+    hyphenated word is kept depends on the final pronunciation words, so
+    every kept group is staged in order, held=1 marking hyphenated words,
+    and merge_spelling() resolves them once the pronunciation phase is done.
+    """
+    source_conn = open_source(read_only=True)
+    staging = BulkWriter(staging_path, tables=SPELLING_STAGING_TABLES)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    cache = GroupCache(CACHE_FILE, cache_mb) if cache_mb else None
+    try:
+        for word, row in kept_spelling_groups(source_conn, pool, workers, excluded_pairs, cache):
+            staging.insert(
+                "INSERT INTO spelling_staging VALUES (?, ?, ?, ?, ?)",
+                (*row, int(has_hyphen(word)))
+            )
+        staging.insert("INSERT INTO spelling_stats VALUES (?)", (json.dumps(FILTER_STATS),))
+        staging.finish()
+    except BaseException:
+        staging.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if cache is not None:
+            cache.close()
+            cache.report("[spelling] Group cache")
+        source_conn.close()
+
+def merge_spelling(staging_path, writer, pronunciation_words):
+    """Copy staged spelling matches into the target, applying the hyphen rule"""
+    conn = sqlite3.connect(staging_path)
+    FILTER_STATS.update(json.loads(conn.execute("SELECT stats FROM spelling_stats").fetchone()[0]))
+    saved = 0
+    for key, languages, overlap, entries, held in conn.execute(
+        "SELECT match_key, languages, gloss_overlap, entries, held FROM spelling_staging ORDER BY rowid"
+    ):
+        # Hyphenated words only count if they also have a pronunciation match
+        if held and key not in pronunciation_words:
+            continue
+        save_match(writer, "spelling_matches", (key, languages, overlap, entries))
+        saved += 1
+    conn.close()
+    remove_db_files(staging_path)
+    writer.flush()
+    print(f"[spelling] complete: {saved:,} coincidence sets")
+
+PRONUNCIATION_ROWS = """
+    SELECT k.norm, k.ipa, w.word, w.lang, w.lang_code, w.glosses
+    FROM ipa_keys k
+    JOIN words w ON w.word = k.word AND w.lang = k.lang
+    {where}
+    ORDER BY k.norm, k.seq
+"""
+
+def pronunciation_groups(source_conn, counts, norms=None, stats=FILTER_STATS):
+    """Yield (norm, entries) groups from words.db's ipa_keys, in norm order.
+    
+    Only one group is held in memory at a time. Within a group, entries
+    keep the order of the words.ipa value they came from. norms limits the
+    scan to those keys (see update_coincidences).
+    """
+    ensure_ipa_keys(source_conn)
+    if norms is None:
+        cursor = source_conn.execute(PRONUNCIATION_ROWS.format(where=""))
+    else:
+        cursor = chain.from_iterable(
+            source_conn.execute(PRONUNCIATION_ROWS.format(where="WHERE k.norm = ?"), (norm,))
+            for norm in sorted(norms)
+        )
+    yield from group_pronunciation_rows(cursor, counts, stats)
+
+def group_pronunciation_rows(cursor, counts, stats=FILTER_STATS):
+    """Yield (norm, entries) groups from PRONUNCIATION_ROWS rows"""
+    current_norm = None
+    bucket = []
+    for norm, ipa, word, lang, lang_code, glosses in cursor:
+        counts["rows"] += 1
+        if ROW_FILTERS.check(word, stats, prefix="row_"):
+            continue
+        if norm != current_norm and current_norm is not None:
+            counts["groups"] += 1
+            yield current_norm, bucket
+            bucket = []
+        bucket.append({
+            "word": word,
+            "lang": lang,
+            "lang_code": lang_code,
+            "ipa": ipa,  # Store the specific IPA variant
+            "glosses": glosses or "",
+        })
+        current_norm = norm
+    if bucket:
+        counts["groups"] += 1
+        yield current_norm, bucket
+
+def process_pronunciation(source_conn, writer, excluded_pairs=None, pool=None, workers=1, cache=None):
+    """Group entries by normalized IPA and save the pronunciation matches.
+    
+    Returns the set of words that appear in a saved match, which decides
+    whether hyphenated spelling matches are kept.
+    """
     pronunciation_words = set()
+    counts = Counter()
+    saved = 0
+    reported = 0
+    groups = pronunciation_groups(source_conn, counts)
+    for norm, result in evaluate_groups(groups, pool, workers, excluded_pairs, cache):
+        if counts["rows"] // 500000 > reported:
+            reported = counts["rows"] // 500000
+            print(f"[ipa] scanned {counts['rows']:,} rows, saved {saved:,} groups")
+        if result is None:
+            continue
+        row, words = result
+        save_match(writer, "pronunciation_matches", row)
+        pronunciation_words.update(words)
+        saved += 1
+    writer.flush()
+    print(f"[ipa] scanned {counts['rows']:,} rows, found {counts['groups']:,} unique normalized IPAs")
+    print(f"[ipa] complete: {saved:,} coincidence sets")
+    return pronunciation_words
+
+def translit_groups(source_conn, counts, keys=None):
+    """Yield (translit, entries) groups that span more than one distinct word.
     
-    # Collect all entries by normalized IPA
-    ipa_groups = {}
-    rows = 0
+    Groups of a single word are already spelling groups, so only keys
+    shared by different spellings (such as "bra" and "бра") are yielded,
+    in translit order. keys limits the scan to those keys.
+    """
+    if keys is None:
+        cursor = source_conn.execute(
+            """
+            SELECT translit, word, lang, lang_code, ipa, glosses FROM words
+            WHERE translit IN (
+                SELECT translit FROM words GROUP BY translit HAVING MIN(word) != MAX(word)
+            )
+            ORDER BY translit, word, rowid
+            """
+        )
+    else:
+        cursor = chain.from_iterable(
+            source_conn.execute(
+                """
+                SELECT translit, word, lang, lang_code, ipa, glosses FROM words
+                WHERE translit = ? ORDER BY word, rowid
+                """,
+                (key,)
+            )
+            for key in sorted(keys) if key
+        )
+    current_key = None
+    bucket = []
+    for key, word, lang, lang_code, ipa, glosses in cursor:
+        if ROW_FILTERS.check(word, FILTER_STATS, prefix="row_"):
+            continue
+        if key != current_key and current_key is not None:
+            if len({entry["word"] for entry in bucket}) > 1:
+                yield current_key, bucket
+            bucket = []
+        bucket.append({
+            "word": word,
+            "lang": lang,
+            "lang_code": lang_code,
+            "ipa": ipa,
+            "glosses": glosses or "",
+        })
+        current_key = key
+        counts["rows"] += 1
+    if len({entry["word"] for entry in bucket}) > 1:
+        yield current_key, bucket
+
+def process_transliterated(
+    source_conn,
+    writer,
+    pronunciation_words=None,
+    excluded_pairs=None,
+    pool=None,
+    workers=1,
+    cache=None,
+):
+    """Save spelling matches grouped on the transliteration key.
     
-    for row in cursor:
-        ipa_field = row[0]
-        word = row[1]
-        if has_disallowed_punctuation(word) or is_multiword(word):
+    Groups are evaluated like spelling groups and kept only if entries
+    with at least two different spellings survive. The hyphen rule applies
+    as for spelling matches: a hyphenated group needs one of its words in
+    a pronunciation match.
+    """
+    counts = Counter()
+    saved = 0
+    groups = translit_groups(source_conn, counts)
+    for key, result in evaluate_groups(groups, pool, workers, excluded_pairs, cache):
+        if result is None:
             continue
-        lang = row[2]
-        lang_code = row[3]
-        glosses = row[4] or ""
-        
-        # Split multiple IPAs (English words may have "GA, RP" format)
-        ipas = [ipa.strip() for ipa in ipa_field.split(",")]
-        
-        for ipa in ipas:
-            if not ipa:
-                continue
-            norm = normalize_ipa(ipa)
-            if len(norm) < 2:
+        row, words = result
+        if len(set(words)) < 2:
+            continue
+        if has_hyphen(key) and pronunciation_words is not None:
+            if not pronunciation_words.intersection(words):
                 continue
-            
-            entry = {
-                "norm": norm,
-                "word": word,
-                "lang": lang,
-                "lang_code": lang_code,
-                "ipa": ipa,  # Store the specific IPA variant
-                "glosses": glosses,
-            }
-            
-            if norm not in ipa_groups:
-                ipa_groups[norm] = []
-            ipa_groups[norm].append(entry)
-        
-        rows += 1
-        if rows % 500000 == 0:
-            print(f"[ipa] scanned {rows:,} rows...")
+        save_match(writer, "transliterated_matches", row)
+        saved += 1
+    writer.flush()
+    print(f"[translit] complete: {saved:,} coincidence sets")
+
+def near_pronunciation_groups(source_conn, stats):
+    """Yield ((a, b), entries) for every pair of IPA keys one edit apart.
     
-    print(f"[ipa] scanned {rows:,} rows, found {len(ipa_groups):,} unique normalized IPAs")
+    Pairs come from near_ipa.near_pairs over the distinct keys of each
+    length; the entries are those of key a followed by those of key b.
+    Keys recur across pairs, so the entries of recently used keys are kept
+    in a least-recently-used memo of at most NEAR_MEMO_ENTRIES entries
+    (plus the current pair); other keys are fetched again.
+    """
+    ensure_ipa_keys(source_conn)
+    longest = source_conn.execute("SELECT MAX(length(norm)) FROM ipa_keys").fetchone()[0] or 0
     
-    # Process each group
+    def keys_by_length():
+        for length in range(NEAR_MIN_LENGTH, longest + 1):
+            yield length, [norm for norm, in source_conn.execute(
+                "SELECT DISTINCT norm FROM ipa_keys WHERE length(norm) = ?", (length,)
+            )]
+    
+    key_entries = OrderedDict()
+    memo_size = 0
+    for pair in near_pairs(keys_by_length()):
+        pair_entries = []
+        for key in pair:
+            entries = key_entries.get(key)
+            if entries is None:
+                rows = source_conn.execute(PRONUNCIATION_ROWS.format(where="WHERE k.norm = ?"), (key,))
+                entries = [
+                    entry for _, bucket in group_pronunciation_rows(rows, Counter(), stats) for entry in bucket
+                ]
+                key_entries[key] = entries
+                memo_size += len(entries)
+            else:
+                key_entries.move_to_end(key)
+            pair_entries.extend(entries)
+        while memo_size > NEAR_MEMO_ENTRIES and len(key_entries) > 2:
+            _, evicted = key_entries.popitem(last=False)
+            memo_size -= len(evicted)
+        yield pair, pair_entries
+
+def process_near_pronunciation(source_conn, writer, excluded_pairs=None, pool=None, workers=1, cache=None):
+    """Save near-homophone matches: groups of two IPA keys one edit apart.
+    
+    Each pair of keys is evaluated like a pronunciation group (same entry
+    filters, MIN_LANGS and GLOSS_THRESHOLD), and is kept only if entries
+    from both keys survive, so every match pairs languages across the edit.
+    Filter counts are kept out of the main report.
+    """
+    stats = Counter()
+    pairs = 0
     saved = 0
-    for norm_key, entries in ipa_groups.items():
-        saved += handle_pronunciation_group(
-            norm_key,
-            entries,
-            target_cursor,
-            pronunciation_words=pronunciation_words,
-            excluded_pairs=excluded_pairs,
+    groups = near_pronunciation_groups(source_conn, stats)
+    for (key, near_key), result in evaluate_groups(groups, pool, workers, excluded_pairs, cache, stats):
+        pairs += 1
+        if pairs % 100000 == 0:
+            print(f"[near] evaluated {pairs:,} key pairs, saved {saved:,} groups")
+        if result is None:
+            continue
+        row = result[0]
+        sides = {normalize_ipa(entry["ipa"]) for entry in json.loads(row[3])}
+        if key not in sides or near_key not in sides:
+            continue
+        match_id = MATCH_ENTRIES.next_id("near_pronunciation_matches")
+        writer.insert(
+            """
+            INSERT INTO near_pronunciation_matches
+                (id, match_key, near_key, distance, languages, gloss_overlap, entries)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (match_id, key, near_key, 1, *row[1:])
         )
+        writer.insert_many(INSERT_ENTRY, MATCH_ENTRIES.rows("near_pronunciation_matches", match_id, row[3]))
+        saved += 1
+    writer.flush()
+    print(f"[near] {pairs:,} IPA key pairs one edit apart")
+    print(f"[near] complete: {saved:,} coincidence sets")
+
+def load_changes(path):
+    """Read changed (word, lang) keys from a rebuild_words_db.py --update log"""
+    if not os.path.exists(path):
+        raise SystemExit(f"Missing change log at {path}")
+    changes = []
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            if line.strip():
+                change = json.loads(line)
+                changes.append((change["word"], change["lang"], change["old_ipa"], change["ipa"]))
+    return changes
+
+def diff_snapshots(source_conn, old_path):
+    """Changed (word, lang, old_ipa, ipa) keys between an older words.db and SOURCE_DB"""
+    if not os.path.exists(old_path):
+        raise SystemExit(f"Missing words.db snapshot at {old_path}")
+    source_conn.execute("ATTACH DATABASE ? AS old", (f"file:{old_path}?mode=ro",))
+    try:
+        changes = source_conn.execute(
+            """
+            SELECT n.word, n.lang, o.ipa, n.ipa
+            FROM words n
+            LEFT JOIN old.words o ON o.word = n.word AND o.lang = n.lang
+            WHERE o.word IS NULL
+               OR o.lang_code IS NOT n.lang_code
+               OR o.ipa IS NOT n.ipa
+               OR o.glosses IS NOT n.glosses
+            UNION ALL
+            SELECT o.word, o.lang, o.ipa, NULL
+            FROM old.words o
+            WHERE NOT EXISTS (SELECT 1 FROM words n WHERE n.word = o.word AND n.lang = o.lang)
+            """
+        ).fetchall()
+    finally:
+        source_conn.execute("DETACH DATABASE old")
+    return changes
+
+def match_words(entries_json):
+    return {entry["word"] for entry in json.loads(entries_json) if entry.get("word")}
+
+def in_pronunciation_matches(source_conn, target_conn, word):
+    """Check if word appears in any saved pronunciation match.
     
-    target_conn.commit()
-    print(f"[ipa] complete: {saved:,} coincidence sets")
-    return pronunciation_words
+    A word can only be in the groups of its own normalized IPA keys, so
+    only those rows need looking at.
+    """
+    norms = [norm for norm, in source_conn.execute(
+        "SELECT DISTINCT norm FROM ipa_keys WHERE word = ?", (word,)
+    )]
+    for norm in norms:
+        for entries, in target_conn.execute(
+            "SELECT entries FROM pronunciation_matches WHERE match_key = ?", (norm,)
+        ):
+            if word in match_words(entries):
+                return True
+    return False
 
+def delete_matches(target_conn, table, keys):
+    """Delete the matches with these keys and their child rows"""
+    keys = [(key,) for key in keys]
+    for child in ("coincidence_entries", "match_key_grams"):
+        target_conn.executemany(
+            f"""
+            DELETE FROM {child}
+            WHERE kind = '{MATCH_KINDS[table]}'
+              AND match_id IN (SELECT id FROM {table} WHERE match_key = ?)
+            """,
+            keys
+        )
+    target_conn.executemany(f"DELETE FROM {table} WHERE match_key = ?", keys)
+
+def insert_match(target_conn, match_entries, table, row):
+    """save_match for an in-place update: SQLite assigns the match id"""
+    match_id = target_conn.execute(
+        f"INSERT INTO {table} (match_key, languages, gloss_overlap, entries) VALUES (?, ?, ?, ?)",
+        row
+    ).lastrowid
+    target_conn.executemany(INSERT_ENTRY, match_entries.rows(table, match_id, row[-1]))
+    target_conn.executemany(INSERT_GRAM, gram_rows(table, match_id, row[0]))
 
-def handle_pronunciation_group(norm_key, entries, cursor, pronunciation_words=None, excluded_pairs=None):
-    entries = filter_entries(entries)
-    reduced = reduce_entries(entries)
-    if len(reduced) < MIN_LANGS:
-        return 0
-    if has_excluded_language_pair(reduced, excluded_pairs or set()):
-        return 0
-    overlap = gloss_distance(reduced)
-    if overlap >= GLOSS_THRESHOLD:
-        return 0
-    save_match(cursor, "pronunciation_matches", norm_key, reduced, overlap)
-    if pronunciation_words is not None:
-        for entry in reduced:
-            word = entry.get("word")
-            if word:
-                pronunciation_words.add(word)
-    return 1
-
-def main():
+def update_coincidences(changes, excluded_pairs=None):
+    """Recompute only the matches affected by changed words.db rows, in place.
+    
+    changes are (word, lang, old_ipa, ipa) keys, from load_changes() or
+    diff_snapshots(). The affected keys are the changed words (spelling)
+    and the normalized keys of their old and new IPA (pronunciation), and
+    the transliteration keys of the changed words. A hyphenated word's
+    spelling match also depends on whether the word is in some
+    pronunciation match, so hyphenated words in the old or new rows of a
+    recomputed pronunciation key are rechecked too. Recomputed rows are
+    deleted and re-inserted in one transaction, together with their
+    coincidence_entries and match_key_grams rows, so they get new ids; the
+    content matches a full rebuild. language_stats, language_pair_matches
+    and match_links are then refilled from coincidence_entries.
+    near_pronunciation_matches is not updated; it needs a full build with
+    --near.
+    """
+    if not os.path.exists(TARGET_DB):
+        raise SystemExit(f"Missing {TARGET_DB}; run a full build first")
+    source_conn = open_source()
+    ensure_ipa_keys(source_conn)
+    ensure_translit(source_conn)
+    target_conn = sqlite3.connect(TARGET_DB)
+    tables = {name for name, in target_conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    missing = [name for name in ("coincidence_entries", "match_key_grams") if name not in tables]
+    if missing:
+        target_conn.close()
+        source_conn.close()
+        raise SystemExit(f"{TARGET_DB} has no {', '.join(missing)} table; run a full build first")
+    match_entries = MatchEntries.from_db(target_conn)
+    spelling_keys = {word for word, _, _, _ in changes}
+    norms = {
+        norm
+        for _, _, old_ipa, ipa in changes
+        for field in (old_ipa, ipa)
+        for _, norm in ipa_variants(field)
+    }
+    print(f"Updating {len(spelling_keys):,} spelling keys and {len(norms):,} IPA keys "
+          f"for {len(changes):,} changed entries")
+    counts = Counter()
+    try:
+        with target_conn:
+            linked_words = set()
+            for norm in norms:
+                for entries, in target_conn.execute(
+                    "SELECT entries FROM pronunciation_matches WHERE match_key = ?", (norm,)
+                ):
+                    linked_words |= match_words(entries)
+            delete_matches(target_conn, "pronunciation_matches", norms)
+            groups = pronunciation_groups(source_conn, Counter(), norms=norms)
+            for _, result in evaluate_groups(groups, excluded_pairs=excluded_pairs):
+                if result is None:
+                    continue
+                row, words = result
+                insert_match(target_conn, match_entries, "pronunciation_matches", row)
+                linked_words.update(words)
+                counts["pronunciation"] += 1
+            
+            spelling_keys |= {word for word in linked_words if has_hyphen(word)}
+            delete_matches(target_conn, "spelling_matches", spelling_keys)
+            groups = spelling_groups(source_conn, Counter(), words=spelling_keys)
+            for word, result in evaluate_groups(groups, excluded_pairs=excluded_pairs):
+                if result is None:
+                    continue
+                # Hyphenated words only count if they also have a pronunciation match
+                if has_hyphen(word) and not in_pronunciation_matches(source_conn, target_conn, word):
+                    continue
+                insert_match(target_conn, match_entries, "spelling_matches", result[0])
+                counts["spelling"] += 1
+            
+            translit_keys = {translit_key(word) for word in spelling_keys}
+            delete_matches(target_conn, "transliterated_matches", translit_keys)
+            groups = translit_groups(source_conn, Counter(), keys=translit_keys)
+            for key, result in evaluate_groups(groups, excluded_pairs=excluded_pairs):
+                if result is None:
+                    continue
+                row, words = result
+                if len(set(words)) < 2:
+                    continue
+                if has_hyphen(key) and not any(
+                    in_pronunciation_matches(source_conn, target_conn, word) for word in set(words)
+                ):
+                    continue
+                insert_match(target_conn, match_entries, "transliterated_matches", row)
+                counts["translit"] += 1
+            target_conn.executemany(INSERT_LANGUAGE, match_entries.take_languages())
+            for table, schema, fill in (
+                ("language_stats", LANGUAGE_STATS_TABLE, FILL_LANGUAGE_STATS),
+                ("language_pair_matches", LANGUAGE_PAIRS_TABLE, FILL_LANGUAGE_PAIRS),
+                ("match_links", MATCH_LINKS_TABLE, FILL_MATCH_LINKS),
+            ):
+                target_conn.execute(f"DROP TABLE IF EXISTS {table}")
+                target_conn.execute(schema)
+                target_conn.execute(fill)
+    finally:
+        target_conn.close()
+        source_conn.close()
+    print(f"[ipa] recomputed {len(norms):,} keys: {counts['pronunciation']:,} coincidence sets")
+    print(f"[spelling] recomputed {len(spelling_keys):,} keys: {counts['spelling']:,} coincidence sets")
+    print(f"[translit] recomputed {len(translit_keys):,} keys: {counts['translit']:,} coincidence sets")
+    print(f"✓ Updated {TARGET_DB}")
+
+def open_source(read_only=False):
+    if read_only:
+        return sqlite3.connect(f"file:{SOURCE_DB}?mode=ro", uri=True)
+    return sqlite3.connect(SOURCE_DB)
+
+def main(workers=1, concurrent=True, cache_mb=CACHE_MB, near=False):
+    """Build TARGET_DB, running the two phases concurrently by default.
+    
+    With concurrent, the spelling phase runs in its own process (see
+    spelling_phase) while the pronunciation phase runs here, each on a
+    read-only connection, and workers is split between them. The output
+    is identical to a sequential run.
+    
+    Reduced groups are cached in CACHE_FILE, up to cache_mb (None turns
+    the cache off). near adds the near-homophone stage, which runs after
+    the pronunciation phase.
+    """
     if not os.path.exists(SOURCE_DB):
         raise SystemExit(f"Missing source database at {SOURCE_DB}")
-    source_conn = sqlite3.connect(SOURCE_DB)
-    target_conn = init_target_db()
+    # An older words.db may need its ipa_keys table and translit column built first
+    source_conn = open_source()
+    ensure_ipa_keys(source_conn)
+    ensure_translit(source_conn)
+    source_conn.close()
+    writer = init_target_db()
     excluded_pairs = load_lexical_similarity_pairs()
+    spelling = None
+    if concurrent:
+        spelling_workers = workers // 2
+        workers -= spelling_workers
+        spelling = multiprocessing.Process(
+            target=spelling_phase,
+            args=(SPELLING_STAGING, spelling_workers, excluded_pairs, cache_mb),
+        )
+        spelling.start()
+        print("Running the spelling phase concurrently")
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    if pool is not None:
+        print(f"Evaluating groups in {workers} worker processes")
+    cache = GroupCache(CACHE_FILE, cache_mb) if cache_mb else None
+    source_conn = open_source(read_only=concurrent)
     try:
         pronunciation_words = process_pronunciation(
             source_conn,
-            target_conn,
+            writer,
             excluded_pairs=excluded_pairs,
+            pool=pool,
+            workers=workers,
+            cache=cache,
         )
-        process_spelling(
+        if near:
+            process_near_pronunciation(
+                source_conn,
+                writer,
+                excluded_pairs=excluded_pairs,
+                pool=pool,
+                workers=workers,
+                cache=cache,
+            )
+        process_transliterated(
             source_conn,
-            target_conn,
+            writer,
             pronunciation_words=pronunciation_words,
             excluded_pairs=excluded_pairs,
+            pool=pool,
+            workers=workers,
+            cache=cache,
         )
+        if spelling is not None:
+            spelling.join()
+            if spelling.exitcode != 0:
+                raise SystemExit(f"Spelling phase failed (exit code {spelling.exitcode})")
+            merge_spelling(SPELLING_STAGING, writer, pronunciation_words)
+        else:
+            process_spelling(
+                source_conn,
+                writer,
+                pronunciation_words=pronunciation_words,
+                excluded_pairs=excluded_pairs,
+                pool=pool,
+                workers=workers,
+                cache=cache,
+            )
+        print("Filter rules (rows before grouping):")
+        ROW_FILTERS.report(FILTER_STATS, prefix="row_")
+        print("Filter rules (entries within groups):")
+        WORD_FILTERS.report(FILTER_STATS)
+        ENTRY_FILTERS.report(FILTER_STATS)
+        print(f"  - Skipped {FILTER_STATS['english_self_gloss']:,} by english_self_gloss")
+        excluded_pairs.report(FILTER_STATS)
+        if cache is not None:
+            cache.close()
+            cache.report("[ipa] Group cache" if concurrent else "Group cache")
+            cache = None
+        save_languages(writer)
+        print("Creating indexes and analyzing...")
+        writer.finish()
+        print(f"✓ Wrote {TARGET_DB}")
+    except BaseException:
+        writer.abort()
+        if spelling is not None:
+            spelling.terminate()
+            spelling.join()
+            remove_db_files(SPELLING_STAGING)
+            remove_db_files(SPELLING_STAGING + ".tmp")
+        raise
     finally:
+        if pool is not None:
+            pool.terminate()
+        if cache is not None:
+            cache.close()
         source_conn.close()
-        target_conn.close()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build coincidences.db from words.db")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for evaluating groups (0 = all cores, default: 1)",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run the spelling phase after the pronunciation phase instead of alongside it",
+    )
+    parser.add_argument(
+        "--near",
+        action="store_true",
+        help="Also find near-homophones (IPA keys one edit apart) for near_pronunciation_matches",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=CACHE_MB,
+        help=f"Size limit of the reduced-group cache in {CACHE_FILE} (default: {CACHE_MB})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the reduced-group cache",
+    )
+    parser.add_argument(
+        "--changes",
+        nargs="?",
+        const=CHANGES_FILE,
+        help=f"Update {TARGET_DB} in place for the keys in a change log (default: {CHANGES_FILE})",
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="OLD_WORDS_DB",
+        help=f"Update {TARGET_DB} in place for the rows that differ between OLD_WORDS_DB and {SOURCE_DB}",
+    )
+    args = parser.parse_args()
+    if args.changes or args.diff:
+        if args.diff:
+            conn = open_source(read_only=True)
+            changes = diff_snapshots(conn, args.diff)
+            conn.close()
+        else:
+            changes = load_changes(args.changes)
+        update_coincidences(changes, excluded_pairs=load_lexical_similarity_pairs())
+    else:
+        main(
+            workers=args.workers or os.cpu_count(),
+            concurrent=not args.sequential,
+            cache_mb=None if args.no_cache else args.cache_mb,
+            near=args.near,
+        )
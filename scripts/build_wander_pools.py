@@ -0,0 +1,210 @@
+"""
+Build the Wander page's word pools offline (data/wander_pools.json.gz).
+
+wander/wander.js used to download the whole coincidences database and, on
+every visit, read up to 20,000 rows per match table, collapse languages
+whose glosses overlap (filterRelatedLanguages), index the entries by word
+(byWord, filtered again per word), and bucket the words into pools:
+
+- primary: words in 3 or more languages
+- secondary: words in exactly 2 languages
+- fallback: every word
+
+keeping only words that pass meetsLengthRequirement (Latin-script words
+of at most 5 characters; other scripts unrestricted). This script applies
+the same rules, with the same stop words and threshold, and writes only
+what the page shows:
+
+    {
+      "version": 1,
+      "rules": {...},
+      "words": {word: [[lang, [ipa, ...], [meaning, ...]], ...]},
+      "pools": {"primary": [word, ...], "secondary": [word, ...]}
+    }
+
+"words" holds every word that can be drawn (the fallback pool) with the
+deduplicated IPAs and meanings of its first three languages, the ones a
+tile reveals. Lists are sorted and gzip's mtime is 0, so the file only
+changes when the data does. Bump WANDER_VERSION when the rules or format
+change.
+
+Usage:
+    python scripts/build_wander_pools.py [--row-limit N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+
+SOURCE_DB = "data/coincidences.db"
+TARGET_FILE = "data/wander_pools.json.gz"
+WANDER_VERSION = 1
+WANDER_TABLES = ["spelling_matches", "pronunciation_matches"]
+ROW_LIMIT = 20000  # Rows read per table, as wander.js did (0 = all)
+GLOSS_OVERLAP_THRESHOLD = 0.10
+LATIN_MAX_LENGTH = 5
+TILE_LANGUAGES = 3  # Languages revealed on a tile
+
+# wander.js's own list, which differs from the build's STOP_WORDS
+STOP_WORDS = {
+    "the", "and", "for", "are", "was", "were", "has", "have", "had",
+    "with", "from", "that", "this", "these", "those", "than", "then",
+    "such", "when", "where", "what", "which", "who", "whom", "whose",
+    "been", "being", "does", "did", "will", "would", "could", "should",
+    "may", "might", "must", "can", "its", "not", "but", "all", "any",
+    "some", "each", "every", "both", "few", "more", "most", "other",
+    "into", "through", "during", "before", "after", "above", "below",
+    "between", "under", "again", "further", "once", "here", "there",
+    "also", "only", "own", "same", "very", "just", "now", "used",
+}
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+LATIN_PATTERN = re.compile(r"[ -ɏḀ-ỿ]+")
+
+
+def tokenize_gloss(text):
+    if not text:
+        return set()
+    return {t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 2 and t not in STOP_WORDS}
+
+
+def gloss_overlap(tokens1, tokens2):
+    if not tokens1 or not tokens2:
+        return 0
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+
+def filter_related_languages(entries):
+    """Keep the first entry of each cluster of entries with overlapping glosses"""
+    if len(entries) < 2:
+        return entries
+    tokens = [tokenize_gloss(entry["meaning"]) for entry in entries]
+    assigned = set()
+    kept = []
+    for i in range(len(entries)):
+        if i in assigned:
+            continue
+        assigned.add(i)
+        kept.append(entries[i])
+        for j in range(i + 1, len(entries)):
+            if j not in assigned and gloss_overlap(tokens[i], tokens[j]) >= GLOSS_OVERLAP_THRESHOLD:
+                assigned.add(j)
+    return kept
+
+
+def meets_length_requirement(word):
+    if not word:
+        return False
+    if LATIN_PATTERN.fullmatch(word):
+        return len(word) <= LATIN_MAX_LENGTH
+    return True
+
+
+def load_dataset(conn, row_limit=ROW_LIMIT):
+    """The filtered entries of every match row, in table and row order"""
+    dataset = []
+    limit = f"LIMIT {int(row_limit)}" if row_limit else ""
+    for table in WANDER_TABLES:
+        for key, entries_json in conn.execute(f"SELECT match_key, entries FROM {table} ORDER BY rowid {limit}"):
+            entries = json.loads(entries_json)
+            if not isinstance(entries, list):
+                continue
+            dataset.extend(filter_related_languages([
+                {
+                    "word": entry.get("word") or key or "",
+                    "ipa": entry.get("ipa") or "",
+                    "language": entry.get("lang") or entry.get("lang_code") or "",
+                    "meaning": entry.get("glosses") or entry.get("gloss") or entry.get("meaning") or "",
+                }
+                for entry in entries
+            ]))
+    return dataset
+
+
+def index_by_word(dataset):
+    """{word: (rows, languages)} with related languages filtered again per word"""
+    by_word = {}
+    for row in dataset:
+        if not row["word"]:
+            continue
+        rows, languages = by_word.setdefault(row["word"], ([], {}))
+        rows.append(row)
+        if row["language"]:
+            languages[row["language"]] = None  # dict as an insertion-ordered set
+    for word, (rows, languages) in by_word.items():
+        if len(rows) > 1:
+            rows[:] = filter_related_languages(rows)
+            by_word[word] = (rows, dict.fromkeys(row["language"] for row in rows if row["language"]))
+    return by_word
+
+
+def tile(rows, languages):
+    """[[lang, ipas, meanings]] for the languages a tile reveals"""
+    shown = []
+    for lang in list(languages)[:TILE_LANGUAGES]:
+        lang_rows = [row for row in rows if row["language"] == lang]
+        ipas = list(dict.fromkeys(row["ipa"] for row in lang_rows if row["ipa"]))
+        meanings = list(dict.fromkeys(row["meaning"] for row in lang_rows if row["meaning"]))
+        shown.append([lang, ipas, meanings])
+    return shown
+
+
+def build_pools(source=SOURCE_DB, target=TARGET_FILE, row_limit=ROW_LIMIT):
+    if not os.path.exists(source):
+        raise SystemExit(f"Missing {source}; run build_coincidence_db.py first")
+    conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        dataset = load_dataset(conn, row_limit)
+    finally:
+        conn.close()
+    by_word = index_by_word(dataset)
+    words = {}
+    pools = {"primary": [], "secondary": []}
+    for word in sorted(by_word):
+        if not meets_length_requirement(word):
+            continue
+        rows, languages = by_word[word]
+        words[word] = tile(rows, languages)
+        if len(languages) >= 3:
+            pools["primary"].append(word)
+        elif len(languages) == 2:
+            pools["secondary"].append(word)
+    artifact = {
+        "version": WANDER_VERSION,
+        "rules": {
+            "tables": WANDER_TABLES,
+            "row_limit": row_limit,
+            "gloss_overlap_threshold": GLOSS_OVERLAP_THRESHOLD,
+            "latin_max_length": LATIN_MAX_LENGTH,
+            "tile_languages": TILE_LANGUAGES,
+        },
+        "words": words,
+        "pools": pools,
+    }
+    data = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(gzip.compress(data, compresslevel=9, mtime=0))
+    os.replace(tmp_path, target)
+    print(f"{len(dataset):,} entries, {len(by_word):,} words")
+    print(f"Pools: {len(pools['primary']):,} primary, {len(pools['secondary']):,} secondary, "
+          f"{len(words):,} fallback")
+    print(f"✓ Wrote {target} ({os.path.getsize(target) / 1024:,.0f} KB; "
+          f"{os.path.getsize(source) / 1024:,.0f} KB database)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Wander page's word pools")
+    parser.add_argument("--source", default=SOURCE_DB, help=f"Database to read (default: {SOURCE_DB})")
+    parser.add_argument("--output", default=TARGET_FILE, help=f"Output file (default: {TARGET_FILE})")
+    parser.add_argument(
+        "--row-limit",
+        type=int,
+        default=ROW_LIMIT,
+        help=f"Rows read per match table, as wander.js did (0 = all, default: {ROW_LIMIT})",
+    )
+    args = parser.parse_args()
+    build_pools(args.source, args.output, args.row_limit)
@@ -0,0 +1,125 @@
+"""
+Bulk-load writer for the final words.db and coincidences.db files.
+
+Both build scripts write a fresh database from scratch, so there is nothing
+to protect while loading. BulkWriter builds the file next to its final path
+with build-time pragmas (no journal, no fsync, a large page cache),
+batches inserts into large transactions, creates the secondary indexes only
+after the data is in, runs ANALYZE, and finally swaps the file into place
+with an atomic rename. The new file is fsynced before the rename and its
+directory after it, so a failed or interrupted build, or a crash during
+the swap, leaves either the previous database or the complete new one.
+
+Usage:
+    writer = BulkWriter("data/words.db", tables=[...], indexes=[...])
+    writer.insert("INSERT INTO words VALUES (?, ?, ?, ?, ?)", row)
+    writer.finish()
+"""
+
+import os
+import sqlite3
+
+PAGE_SIZE = 8192
+CACHE_MB = 512
+BATCH_ROWS = 10000  # Rows buffered per statement before executemany
+COMMIT_ROWS = 500000  # Rows per transaction
+SIDECAR_SUFFIXES = ("-journal", "-wal", "-shm")
+
+
+class BulkWriter:
+    """Write a new SQLite database as a bulk load, then swap it into place"""
+
+    def __init__(self, path, tables, indexes=(), tmp_path=None, page_size=PAGE_SIZE, cache_mb=CACHE_MB):
+        self.path = path
+        self.tmp_path = tmp_path or path + ".tmp"
+        self.indexes = list(indexes)
+        self.pending = {}
+        self.uncommitted = 0
+        self.rows = 0
+        remove_db_files(self.tmp_path)
+        self.conn = sqlite3.connect(self.tmp_path)
+        # page_size only takes effect before the first table is created
+        self.conn.execute(f"PRAGMA page_size={int(page_size)}")
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute(f"PRAGMA cache_size={-int(cache_mb) * 1024}")
+        for sql in tables:
+            self.conn.execute(sql)
+
+    def insert(self, sql, row):
+        """Queue one row for the given INSERT statement"""
+        batch = self.pending.setdefault(sql, [])
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            self.flush(sql)
+
+    def insert_many(self, sql, rows):
+        for row in rows:
+            self.insert(sql, row)
+
+    def flush(self, sql=None):
+        """Write queued rows (for one statement, or all) to the database"""
+        for key in [sql] if sql is not None else list(self.pending):
+            batch = self.pending.pop(key, None)
+            if not batch:
+                continue
+            self.conn.executemany(key, batch)
+            self.uncommitted += len(batch)
+            self.rows += len(batch)
+        if self.uncommitted >= COMMIT_ROWS:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def execute(self, sql, params=()):
+        """Run a statement against everything inserted so far"""
+        self.flush()
+        self.conn.execute(sql, params)
+
+    def finish(self):
+        """Create indexes, analyze, and atomically replace path with the new file"""
+        self.flush()
+        self.conn.commit()
+        for sql in self.indexes:
+            self.conn.execute(sql)
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.close()
+        # Built without a journal or fsyncs, so flush it before it can replace path
+        fsync_file(self.tmp_path)
+        # Journal/WAL files of the database being replaced would be applied
+        # to the new one; it has none of its own (journal_mode=OFF)
+        for suffix in SIDECAR_SUFFIXES:
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        os.replace(self.tmp_path, self.path)
+        fsync_directory(os.path.dirname(self.path) or ".")
+
+    def abort(self):
+        """Discard the partially written file"""
+        self.pending = {}
+        self.conn.close()
+        remove_db_files(self.tmp_path)
+
+
+def fsync_file(path):
+    with open(path, "rb+") as handle:
+        os.fsync(handle.fileno())
+
+
+def fsync_directory(path):
+    """Persist renames in path (not supported on Windows)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_db_files(path):
+    for suffix in ("", *SIDECAR_SUFFIXES):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
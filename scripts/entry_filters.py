@@ -0,0 +1,295 @@
+"""
+Entry filter rules shared by rebuild_words_db.py and build_coincidence_db.py.
+
+Each rule is a predicate that returns True when an entry should be dropped.
+Rules take either a word string or an entry dict (see RULES), and are run
+through a FilterEngine, which checks them cheapest first and keeps a
+rejection counter and the time spent for every rule.
+
+The character-class rules (digits, punctuation, whitespace, Latin script)
+are compiled once per process into regexes built from a scan of the
+Unicode table. They match exactly what the str.isdigit / str.isalnum /
+unicodedata.category loops they replace would, without a Python-level
+loop (or a unicodedata call) per character.
+
+Compare against the previous per-function checks with:
+    python scripts/bench_entry_filters.py
+"""
+
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+from time import perf_counter
+
+# Bump when a rule's code changes what it rejects, so cached results are
+# invalidated. Changes to the constants below are picked up by filter_config().
+FILTER_VERSION = 1
+
+# Rule timings are measured on one check in TIMING_SAMPLE and scaled up,
+# which keeps the clock calls out of the hot path
+TIMING_SAMPLE = 64
+
+ALLOWED_WORD_CHARS = set("-'")
+LATIN_SCRIPT_MAX_LENGTH = 9  # Longer Latin-script words are likely related
+
+BORROWING_PREFIXES = ("borrowed from", "unadapted borrowing from", "borrowing from")
+BORROWING_CATEGORY = "terms borrowed from"
+ALTERNATIVE_FORM_MARKER = "alternative form of"
+GLOSS_PRIMARY_SPLIT = re.compile(r"[;|/]")
+GLOSS_PARTS_SPLIT = re.compile(r"[;|/,]")
+PARENTHESIZED = re.compile(r"\([^)]*\)")
+
+# Compiled by compile_char_classes()
+DIGIT_CHAR = None
+DISALLOWED_CHAR = None
+SPACE_CHAR = re.compile(r"\s")  # \s is exactly str.isspace() for str patterns
+SCRIPT_CHARS = None
+LATIN_CHARS = None
+
+
+def char_class(codepoints, negate=False):
+    """Build a regex character class from a sorted list of code points"""
+    ranges = []
+    start = prev = None
+    for cp in codepoints:
+        if prev is not None and cp == prev + 1:
+            prev = cp
+            continue
+        if start is not None:
+            ranges.append((start, prev))
+        start = prev = cp
+    if start is not None:
+        ranges.append((start, prev))
+    parts = [
+        re.escape(chr(lo)) if lo == hi else f"{re.escape(chr(lo))}-{re.escape(chr(hi))}"
+        for lo, hi in ranges
+    ]
+    return re.compile(("[^" if negate else "[") + "".join(parts) + "]")
+
+
+def compile_char_classes():
+    """Scan the Unicode table once and compile the character-class regexes"""
+    global DIGIT_CHAR, DISALLOWED_CHAR, SCRIPT_CHARS, LATIN_CHARS
+    if DIGIT_CHAR is not None:
+        return
+    digits = []
+    word_chars = []
+    script_chars = []
+    for cp in range(sys.maxunicode + 1):
+        ch = chr(cp)
+        if ch.isdigit():
+            digits.append(cp)
+        alpha = ch.isalpha() or ch in ALLOWED_WORD_CHARS
+        if alpha:
+            script_chars.append(cp)
+        # Alphanumerics, allowed word chars, and combining/mark characters
+        # (diacritics, viramas, etc.)
+        if alpha or ch.isalnum() or unicodedata.category(ch).startswith("M"):
+            word_chars.append(cp)
+    DIGIT_CHAR = char_class(digits)
+    DISALLOWED_CHAR = char_class(word_chars, negate=True)
+    SCRIPT_CHARS = char_class(script_chars)
+    LATIN_CHARS = char_class([cp for cp in script_chars if cp < 0x0370])
+
+
+def normalize_language(lang):
+    if not lang:
+        return ""
+    return " ".join(lang.strip().lower().split())
+
+
+def normalize_for_comparison(text):
+    if not text:
+        return ""
+    text = PARENTHESIZED.sub(" ", text)
+    return "".join(ch for ch in text.lower() if ch.isalpha())
+
+
+# Word rules (take the word string)
+
+def is_short(word):
+    """Check if word is empty or has at most 2 characters"""
+    return not word or len(word) <= 2
+
+
+def is_affix(word):
+    """Check if word is a prefix or suffix (starts or ends with hyphen)"""
+    return word.startswith("-") or word.endswith("-")
+
+
+def has_digits(word):
+    """Check if word contains any digits (e.g., '4x4', '311')"""
+    if word.isalpha():  # Fast path: letters are never digits
+        return False
+    return DIGIT_CHAR.search(word) is not None
+
+
+def has_disallowed_punctuation(word):
+    """Check for anything except letters, digits, marks, - and '"""
+    if not word:
+        return True
+    if word.isalnum():  # Fast path for plain words
+        return False
+    return DISALLOWED_CHAR.search(word) is not None
+
+
+def is_multiword(word):
+    if not word:
+        return True
+    return SPACE_CHAR.search(word) is not None
+
+
+def is_latin_script(word):
+    """Check if a word is primarily written in Latin script."""
+    if not word:
+        return False
+    # More than 50% of the letters (and - ') must be below U+0370
+    total_chars = len(SCRIPT_CHARS.findall(word))
+    return total_chars > 0 and len(LATIN_CHARS.findall(word)) / total_chars > 0.5
+
+
+def is_long_latin(word):
+    """Check for Latin-script words longer than LATIN_SCRIPT_MAX_LENGTH"""
+    return len(word) > LATIN_SCRIPT_MAX_LENGTH and is_latin_script(word)
+
+
+# Entry rules (take an entry dict)
+
+def is_loanword(entry):
+    """Check if a raw wiktextract entry is a loanword based on etymology or categories.
+
+    Two methods of detection:
+    1. Etymology: Detects phrases like "borrowed from" and "unadapted borrowing from"
+       at the BEGINNING of the etymology text, which indicate the word was
+       taken from another language. If these phrases appear later in the
+       etymology (e.g., referring to an older root), the entry is not
+       considered a loanword.
+    2. Categories: Checks for Wiktionary categories like "English terms borrowed from French"
+       which explicitly mark borrowed terms.
+    """
+    # Check categories first (more reliable)
+    categories = entry.get("categories", [])
+    if categories:
+        lang = entry.get("lang", "").strip().lower()
+        for cat in categories:
+            cat_lower = cat.lower()
+            # Match patterns like "English terms borrowed from French"
+            if lang in cat_lower and BORROWING_CATEGORY in cat_lower:
+                return True
+
+    # Check etymology text
+    etymology = entry.get("etymology_text", "") or entry.get("etymology", "")
+    if not etymology:
+        return False
+    # Only match if borrowing phrases appear at the very beginning
+    return etymology.lower().strip().startswith(BORROWING_PREFIXES)
+
+
+def is_translingual(entry):
+    return normalize_language(entry.get("lang")) == "translingual"
+
+
+def is_alternative_form_gloss(entry):
+    glosses = (entry.get("glosses") or "").strip()
+    if not glosses:
+        return False
+    primary = GLOSS_PRIMARY_SPLIT.split(glosses, maxsplit=1)[0].strip().lower()
+    return ALTERNATIVE_FORM_MARKER in primary
+
+
+def is_self_referential_gloss(entry):
+    """Check if the gloss is just the word itself (e.g., Spanish word 'hola' with gloss 'hola')."""
+    word = (entry.get("word") or "").strip()
+    glosses = (entry.get("glosses") or "").strip()
+    if not word or not glosses:
+        return False
+    word_norm = normalize_for_comparison(word)
+    # Check if any gloss part is just the word itself
+    for part in GLOSS_PARTS_SPLIT.split(glosses):
+        if normalize_for_comparison(part) == word_norm:
+            return True
+    return False
+
+
+def filter_config():
+    """Everything the rules' results depend on, for cache keys"""
+    return {
+        "version": FILTER_VERSION,
+        "unicode": unicodedata.unidata_version,
+        "allowed_word_chars": sorted(ALLOWED_WORD_CHARS),
+        "latin_script_max_length": LATIN_SCRIPT_MAX_LENGTH,
+        "borrowing_prefixes": list(BORROWING_PREFIXES),
+        "borrowing_category": BORROWING_CATEGORY,
+        "alternative_form_marker": ALTERNATIVE_FORM_MARKER,
+        "gloss_primary_split": GLOSS_PRIMARY_SPLIT.pattern,
+        "gloss_parts_split": GLOSS_PARTS_SPLIT.pattern,
+        "parenthesized": PARENTHESIZED.pattern,
+        "space_char": SPACE_CHAR.pattern,
+    }
+
+
+Rule = namedtuple("Rule", "name cost test")
+
+# cost orders the checks within an engine (cheapest first); it only affects
+# which rule a rejection is counted against, never whether it is rejected
+RULES = {rule.name: rule for rule in [
+    # word rules
+    Rule("short", 1, is_short),
+    Rule("affix", 2, is_affix),
+    Rule("multiword", 3, is_multiword),
+    Rule("digits", 4, has_digits),
+    Rule("punctuation", 4, has_disallowed_punctuation),
+    Rule("long_latin", 5, is_long_latin),
+    # entry rules
+    Rule("translingual", 2, is_translingual),
+    Rule("alternative_form", 6, is_alternative_form_gloss),
+    Rule("loanword", 7, is_loanword),
+    Rule("self_referential", 8, is_self_referential_gloss),
+]}
+
+
+class FilterEngine:
+    """Run a fixed set of RULES cheapest first, counting rejections per rule.
+
+    check() adds one to stats[prefix + name] for the rule that rejected a
+    value and, when timed, an estimate of the seconds spent in each rule to
+    stats[prefix + name + "_seconds"]. stats is any Counter, so counts from
+    worker processes can simply be summed.
+    """
+
+    def __init__(self, names, timed=True):
+        compile_char_classes()
+        self.names = list(names)
+        self.rules = sorted((RULES[name] for name in names), key=lambda rule: rule.cost)
+        self.tests = [(rule.name, rule.test) for rule in self.rules]
+        self.timed = timed
+        self.calls = 0
+
+    def check(self, value, stats, prefix=""):
+        """Return the name of the first rule that rejects value, or None"""
+        self.calls += 1
+        if self.timed and self.calls % TIMING_SAMPLE == 0:
+            return self.check_timed(value, stats, prefix)
+        for name, test in self.tests:
+            if test(value):
+                stats[prefix + name] += 1
+                return name
+        return None
+
+    def check_timed(self, value, stats, prefix=""):
+        for name, test in self.tests:
+            began = perf_counter()
+            rejected = test(value)
+            stats[prefix + name + "_seconds"] += (perf_counter() - began) * TIMING_SAMPLE
+            if rejected:
+                stats[prefix + name] += 1
+                return name
+        return None
+
+    def report(self, stats, prefix=""):
+        """Print the rejection count and time for each rule, in check order"""
+        for rule in self.rules:
+            seconds = stats[prefix + rule.name + "_seconds"]
+            timing = f" (~{seconds:.2f}s)" if self.timed else ""
+            print(f"  - Skipped {stats[prefix + rule.name]:,} by {rule.name}{timing}")
@@ -0,0 +1,193 @@
+"""
+Export coincidences.db for page-at-a-time loading over HTTP Range requests.
+
+Instead of downloading all of coincidences.db.gz before the first query, a
+virtual-file-system client (e.g. sql.js-httpvfs in "chunked" mode) can
+fetch just the database pages a query touches. This export lays the file
+out so that a query touches as few pages as possible:
+
+- A small page size (--page-size, default 4096), the unit of each fetch.
+- Clustered row order: each match table is rewritten in match_key order
+  (ids are renumbered and every table referring to them is remapped), so
+  prefix and exact-key lookups read neighbouring rows, and
+  coincidence_entries is written in (kind, match_id) order so a match's
+  entries share pages.
+- Covering key indexes: idx_spelling_key and idx_pron_key also hold
+  languages and gloss_overlap, so LIKE scans and ranking read only the
+  narrow index and fetch the entries of the rows they return.
+- VACUUM, so each table and index occupies contiguous pages.
+
+The file (db.sqlite3, for servers that answer Range requests on one large
+file) is then also split into fixed-size chunks (db.sqlite3.000, ...) with
+a config.json describing them (database length, chunk size, request size,
+URL prefix), since static hosts often cap the size of a single file.
+
+Usage:
+    python scripts/export_range_db.py [--page-size N] [--chunk-mb N] [--output DIR]
+
+Measure bytes transferred per query with scripts/bench_range_db.py.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+
+from match_entries import MATCH_KINDS
+
+SOURCE_DB = "data/coincidences.db"
+OUTPUT_DIR = "data/range_db"
+DB_NAME = "db.sqlite3"
+CONFIG_FILE = "config.json"
+PAGE_SIZE = 4096
+CHUNK_MB = 10
+SUFFIX_LENGTH = 3
+
+# Columns holding match ids, and the SQL giving the kind of match they refer to
+REMAPPED_COLUMNS = {
+    "coincidence_entries": {"match_id": "c.kind"},
+    "match_key_grams": {"match_id": "c.kind"},
+    "language_pair_matches": {"match_id": "c.kind"},
+    "match_links": {"pronunciation_id": "'pronunciation'", "spelling_id": "'spelling'"},
+}
+
+# Row order for tables that do not already store rows in key order
+CLUSTER_ORDER = {
+    "coincidence_entries": "kind, match_id",
+    "language_stats": "rank",
+}
+
+COVERING_INDEXES = {
+    "idx_spelling_key": "CREATE INDEX idx_spelling_key ON spelling_matches(match_key, languages, gloss_overlap)",
+    "idx_pron_key": "CREATE INDEX idx_pron_key ON pronunciation_matches(match_key, languages, gloss_overlap)",
+}
+
+
+def copy_table(conn, table):
+    """Copy one table from src in clustered order, remapping match ids"""
+    columns = [row[1] for row in conn.execute(f"PRAGMA src.table_info({table})")]
+    remapped = REMAPPED_COLUMNS.get(table, {})
+    select = []
+    for column in columns:
+        if table in MATCH_KINDS and column == "id":
+            select.append(f"(SELECT new_id FROM id_map WHERE kind = '{MATCH_KINDS[table]}' AND old_id = c.id)")
+        elif column in remapped:
+            select.append(
+                f"(SELECT new_id FROM id_map WHERE kind = {remapped[column]} AND old_id = c.{column})"
+            )
+        else:
+            select.append(f"c.{column}")
+    # Match tables are renumbered in match_key order, so ordering by the new id clusters them
+    order = str(columns.index("id") + 1) if table in MATCH_KINDS else CLUSTER_ORDER.get(table)
+    conn.execute(f"""
+        INSERT INTO main.{table} ({', '.join(columns)})
+        SELECT {', '.join(select)} FROM src.{table} c
+        {f"ORDER BY {order}" if order else ""}
+    """)
+
+
+def write_chunks(db_path, out_dir, chunk_bytes):
+    """Split the database into numbered chunk files; return their count"""
+    count = 0
+    with open(db_path, "rb") as handle:
+        for block in iter(lambda: handle.read(chunk_bytes), b""):
+            with open(os.path.join(out_dir, f"{DB_NAME}.{count:0{SUFFIX_LENGTH}d}"), "wb") as chunk:
+                chunk.write(block)
+            count += 1
+    return count
+
+
+def export(source=SOURCE_DB, out_dir=OUTPUT_DIR, page_size=PAGE_SIZE, chunk_mb=CHUNK_MB):
+    if not os.path.exists(source):
+        raise SystemExit(f"Missing {source}; run build_coincidence_db.py first")
+    chunk_bytes = chunk_mb * 1024 * 1024
+    if chunk_bytes % page_size:
+        raise SystemExit("--chunk-mb must be a whole number of pages")
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    db_path = os.path.join(tmp_dir, DB_NAME)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(f"PRAGMA page_size={int(page_size)}")
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("ATTACH DATABASE ? AS src", (source,))
+        objects = conn.execute("""
+            SELECT type, name, tbl_name, sql FROM src.sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY type = 'index', rowid
+        """).fetchall()
+        tables = [(name, sql) for kind, name, _, sql in objects if kind == "table"]
+        conn.execute("""
+            CREATE TEMP TABLE id_map (
+                kind TEXT NOT NULL,
+                old_id INTEGER NOT NULL,
+                new_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, old_id)
+            ) WITHOUT ROWID
+        """)
+        for name, _ in tables:
+            if name in MATCH_KINDS:
+                conn.execute(f"""
+                    INSERT INTO id_map
+                    SELECT '{MATCH_KINDS[name]}', id, ROW_NUMBER() OVER (ORDER BY match_key, id)
+                    FROM src.{name}
+                """)
+        for name, sql in tables:
+            conn.execute(sql)
+            copy_table(conn, name)
+            print(f"Copied {name}")
+        conn.commit()
+        print("Creating indexes...")
+        for kind, name, _, sql in objects:
+            if kind == "index":
+                conn.execute(COVERING_INDEXES.get(name, sql))
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+        print("Vacuuming...")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        size = os.path.getsize(db_path)
+        chunks = write_chunks(db_path, tmp_dir, chunk_bytes)
+        config = {
+            "serverMode": "chunked",
+            "requestChunkSize": page_size,
+            "databaseLengthBytes": size,
+            "serverChunkSize": chunk_bytes,
+            "urlPrefix": f"{DB_NAME}.",
+            "suffixLength": SUFFIX_LENGTH,
+        }
+        with open(os.path.join(tmp_dir, CONFIG_FILE), "w", encoding="utf-8") as handle:
+            json.dump(config, handle, indent=1)
+    except BaseException:
+        conn.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    print(f"✓ Wrote {out_dir}: {size / 1024 / 1024:.1f} MB in {chunks} chunks of up to {chunk_mb} MB "
+          f"({page_size}-byte pages)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export coincidences.db for HTTP Range loading")
+    parser.add_argument("--source", default=SOURCE_DB, help=f"Database to export (default: {SOURCE_DB})")
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PAGE_SIZE,
+        help=f"SQLite page size, also the request size (default: {PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--chunk-mb",
+        type=int,
+        default=CHUNK_MB,
+        help=f"Size of each chunk file (default: {CHUNK_MB})",
+    )
+    args = parser.parse_args()
+    export(args.source, args.output, args.page_size, args.chunk_mb)
@@ -0,0 +1,134 @@
+"""
+Gloss-overlap scoring for build_coincidence_db.py.
+
+Gloss tokens are interned: each distinct gloss string is tokenized once per
+process, and each token gets an integer ID, so an entry's tokens are a
+frozenset of small ints instead of a set of strings re-extracted with a
+regex every time the gloss shows up in a group.
+
+average_overlaps() takes the groups of one evaluate_batch call but
+scores them one group at a time. Groups with fewer than
+VECTOR_MIN_ENTRIES scored entries use set intersections of the
+interned IDs. Larger groups (the big IPA collisions), when NumPy is
+installed, get all their pairwise intersections at once from the product
+of the group's own entry-by-token incidence matrix with its transpose.
+
+Scores are exactly those of the previous set-based gloss_distance: the pair
+ratios are the same correctly rounded int / int divisions, and they are
+added up with sum() in combinations() order.
+
+Compare against the previous implementation with:
+    python scripts/bench_gloss_overlap.py
+"""
+
+import re
+from itertools import combinations
+
+try:
+    import numpy as np
+except ImportError:  # Optional (pip install numpy); without it every group takes the set path
+    np = None
+
+VECTOR_MIN_ENTRIES = 12  # Below this, set operations beat building a matrix
+GLOSS_CACHE_SIZE = 500000  # Distinct gloss strings kept tokenized
+
+TOKEN_PATTERN = re.compile(r"[a-zA-Z]+")
+
+# Common English stop words that don't indicate semantic similarity
+STOP_WORDS = {
+    'the', 'and', 'for', 'are', 'was', 'were', 'has', 'have', 'had',
+    'with', 'from', 'that', 'this', 'these', 'those', 'than', 'then',
+    'such', 'when', 'where', 'what', 'which', 'who', 'whom', 'whose',
+    'been', 'being', 'does', 'did', 'will', 'would', 'could', 'should',
+    'may', 'might', 'must', 'can', 'its', 'not', 'but', 'all', 'any',
+    'some', 'each', 'every', 'both', 'few', 'more', 'most', 'other',
+    'into', 'through', 'during', 'before', 'after', 'above', 'below',
+    'between', 'under', 'again', 'further', 'once', 'here', 'there',
+    'also', 'only', 'own', 'same', 'very', 'just', 'now', 'used'
+}
+
+
+def tokenize_gloss(text):
+    if not text:
+        return set()
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return {t for t in tokens if len(t) > 2 and t not in STOP_WORDS}
+
+
+class TokenInterner:
+    """Map gloss strings to frozensets of integer token IDs, with caching"""
+
+    def __init__(self, cache_size=GLOSS_CACHE_SIZE):
+        self.token_ids = {}
+        self.tokens = []
+        self.glosses = {}
+        self.cache_size = cache_size
+
+    def intern(self, token):
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = self.token_ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def gloss_ids(self, gloss):
+        ids = self.glosses.get(gloss)
+        if ids is None:
+            if len(self.glosses) >= self.cache_size:
+                self.glosses.clear()
+            ids = frozenset(self.intern(token) for token in tokenize_gloss(gloss))
+            self.glosses[gloss] = ids
+        return ids
+
+    def ids(self, glosses):
+        """Token IDs for a list of glosses"""
+        if len(glosses) == 1:
+            return self.gloss_ids(glosses[0])
+        return frozenset().union(*(self.gloss_ids(g) for g in glosses))
+
+    def token_set(self, tokens):
+        """Token IDs for a list of token strings"""
+        return frozenset(self.intern(token) for token in tokens)
+
+    def names(self, ids):
+        """Token strings for a set of token IDs, sorted"""
+        return sorted(self.tokens[i] for i in ids)
+
+
+def pair_overlaps(token_sets):
+    """Jaccard overlap of every pair of non-empty token sets, in combinations() order"""
+    token_sets = [tokens for tokens in token_sets if tokens]
+    if np is not None and len(token_sets) >= VECTOR_MIN_ENTRIES:
+        return matrix_pair_overlaps(token_sets)
+    return [
+        len(left & right) / len(left | right)
+        for left, right in combinations(token_sets, 2)
+    ]
+
+
+def matrix_pair_overlaps(token_sets):
+    """pair_overlaps for a larger group, from one incidence-matrix product"""
+    rows = np.repeat(np.arange(len(token_sets)), [len(tokens) for tokens in token_sets])
+    ids = np.fromiter((i for tokens in token_sets for i in tokens), dtype=np.int64, count=len(rows))
+    _, columns = np.unique(ids, return_inverse=True)
+    incidence = np.zeros((len(token_sets), columns.max() + 1), dtype=np.float32)
+    incidence[rows, columns] = 1.0
+    # float32 counts are exact far beyond any gloss vocabulary size
+    inter = (incidence @ incidence.T).astype(np.int64)
+    sizes = np.diagonal(inter)
+    left, right = np.triu_indices(len(token_sets), k=1)
+    shared = inter[left, right]
+    union = sizes[left] + sizes[right] - shared
+    return (shared / union).tolist()
+
+
+def average_overlap(token_sets):
+    overlaps = pair_overlaps(token_sets)
+    if not overlaps:
+        return 0.0  # No overlap means different meanings
+    return sum(overlaps) / len(overlaps)  # Average overlap instead of max
+
+
+def average_overlaps(groups):
+    """average_overlap for each group in a batch of token-set lists, scored per group"""
+    return [average_overlap(token_sets) for token_sets in groups]
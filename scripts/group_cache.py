@@ -0,0 +1,136 @@
+"""
+Content-addressed cache of reduced coincidence groups.
+
+build_coincidence_db.py spends most of its time filtering and reducing
+groups whose rows have not changed since the last run. GroupCache stores
+each group's filter_entries/reduce_entries result in a small SQLite file,
+keyed by a hash of the group's input rows and a version string
+(build_coincidence_db.cache_version) that hashes the filter and reduction
+settings: rule names, thresholds, prefix lists, regex sources, stop words,
+the gloss limit and MIN_LANGS, plus FILTER_VERSION and REDUCE_VERSION for
+changes to the rule code. Re-running with a different GLOSS_THRESHOLD
+reuses every entry; changing any of those settings misses every entry,
+since the version is part of the key.
+
+The file is kept near max_mb by evicting the least recently used entries
+at the end of each run and returning the freed pages to the filesystem
+(the file uses incremental auto-vacuum). Entries are stamped with the run
+as soon as they are looked up or stored, so when both phases share the
+file, the phase that closes first cannot evict entries the other has used
+in this run.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+CACHE_MB = 256
+LOOKUP_CHUNK = 500  # Keys per SELECT ... IN (...)
+
+
+def group_digest(entries, version):
+    """Hash of a group's input rows and the rules that reduce them"""
+    rows = [
+        (e["word"], e["lang"], e["lang_code"], e["ipa"], e["glosses"])
+        for e in entries
+    ]
+    payload = json.dumps([version, rows], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).digest()
+
+
+class GroupCache:
+    """Reduced-group results on disk, with hit/miss counters"""
+
+    def __init__(self, path, max_mb=CACHE_MB):
+        self.path = path
+        self.max_bytes = max_mb * 1024 * 1024
+        self.run = int(time.time())
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.size = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Both coincidence phases may use the cache at the same time
+        self.conn = sqlite3.connect(path, timeout=60)
+        # Only takes effect on a new file; older files are converted in reclaim()
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS groups (
+                digest BLOB PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                used INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_groups_used ON groups(used)")
+        self.conn.commit()
+
+    def lookup(self, digests):
+        """Return {digest: value} for the digests that are cached"""
+        found = {}
+        wanted = [digest for digest in digests if digest is not None]
+        for start in range(0, len(wanted), LOOKUP_CHUNK):
+            chunk = wanted[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT digest, value FROM groups WHERE digest IN ({placeholders})",
+                chunk
+            ))
+            # Mark hits as used now, not at close (see the module docstring)
+            self.conn.execute(
+                f"UPDATE groups SET used = ? WHERE digest IN ({placeholders}) AND used != ?",
+                [self.run, *chunk, self.run]
+            )
+        self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def store(self, items):
+        """Add (digest, value) pairs"""
+        rows = [(digest, value, len(value), self.run) for digest, value in items]
+        if not rows:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?)", rows)
+        self.stored += len(rows)
+        self.conn.commit()
+
+    def close(self):
+        """Evict the least recently used entries down to max_mb, then close"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM groups").fetchone()[0]
+        if total > self.max_bytes:
+            doomed = []
+            for digest, size in self.conn.execute("SELECT digest, size FROM groups ORDER BY used"):
+                if total <= self.max_bytes:
+                    break
+                doomed.append((digest,))
+                total -= size
+            self.conn.executemany("DELETE FROM groups WHERE digest = ?", doomed)
+            self.evicted += len(doomed)
+            self.conn.commit()
+            self.reclaim()
+        self.size = total
+        self.conn.close()
+
+    def reclaim(self):
+        """Return the pages freed by eviction to the filesystem"""
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # A file created before auto_vacuum was enabled switches over with one VACUUM
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
+        else:
+            # executescript steps the pragma to completion; execute frees one page
+            self.conn.executescript("PRAGMA incremental_vacuum")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def report(self, label="Group cache"):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        print(f"{label}: {self.hits:,} hits, {self.misses:,} misses ({rate:.1f}% hit rate), "
+              f"{self.stored:,} stored, {self.evicted:,} evicted, "
+              f"{self.size / 1024 / 1024:.1f} MB cached")
@@ -0,0 +1,138 @@
+"""
+Normalized IPA keys used to group pronunciation matches.
+
+rebuild_words_db.py writes one ipa_keys row per (word, lang, IPA variant)
+into words.db, and build_coincidence_db.py streams pronunciation groups
+over that table in norm order. seq is the position of a row within its
+norm group (ordered by the words.ipa value, then words and variant
+order), stored at build time so the (norm, seq) index yields the groups
+already sorted. Changing IPA_MAP or normalize_ipa changes the keys, so
+words.db needs a rebuild (or a refresh with
+ensure_ipa_keys(conn, rebuild=True)) afterwards.
+"""
+
+import re
+
+IPA_STRIP = re.compile(r"[\[\]/ˈˌ\s]")
+IPA_MAP = {
+    "ɡ": "g",
+    "θ": "th",
+    "ð": "th",
+    "ʃ": "sh",
+    "ʒ": "zh",
+    "ŋ": "ng",
+    "ɲ": "ny",
+    "ʧ": "ch",
+    "ʤ": "j",
+    "ɑ": "a",
+    "ɒ": "a",
+    "æ": "a",
+    "ʌ": "a",
+    "ɔ": "o",
+    "ɜ": "e",
+    "ə": "e",
+    "ɪ": "i",
+    "ʊ": "u",
+    "ɹ": "r",  # American English r
+    "ɾ": "r",  # Alveolar tap (Spanish/Turkish r)
+    "ʁ": "r",  # French/German r
+    "ʀ": "r",  # Uvular trill
+}
+
+IPA_KEYS_TABLE = """
+    CREATE TABLE ipa_keys (
+        norm TEXT NOT NULL,
+        ipa TEXT NOT NULL,
+        word TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        seq INTEGER NOT NULL DEFAULT 0  -- Order within the norm group (see number_ipa_keys)
+    )
+"""
+IPA_KEYS_INDEXES = [
+    "CREATE INDEX idx_ipa_norm_seq ON ipa_keys(norm, seq)",
+    "CREATE INDEX idx_ipa_word_lang ON ipa_keys(word, lang)",
+]
+
+
+INSERT_IPA_KEY = "INSERT INTO ipa_keys (norm, ipa, word, lang) VALUES (?, ?, ?, ?)"
+
+NUMBER_IPA_KEYS = """
+    UPDATE ipa_keys SET seq = ordered.seq
+    FROM (
+        SELECT k.rowid AS key_id, ROW_NUMBER() OVER (
+            PARTITION BY k.norm ORDER BY w.ipa, w.rowid, k.rowid
+        ) AS seq
+        FROM ipa_keys k
+        JOIN words w ON w.word = k.word AND w.lang = k.lang
+        {where}
+    ) AS ordered
+    WHERE ipa_keys.rowid = ordered.key_id
+"""
+
+
+def normalize_ipa(ipa):
+    if not ipa:
+        return ""
+    ipa = ipa.lower()
+    for src, dest in IPA_MAP.items():
+        ipa = ipa.replace(src, dest)
+    ipa = IPA_STRIP.sub("", ipa)
+    ipa = ipa.replace("ː", "")
+    return ipa
+
+
+def ipa_variants(ipa_field):
+    """Yield (ipa, norm) for each IPA in a words.ipa value.
+
+    English words may have "GA, RP" format; each variant is keyed
+    separately. Variants that normalize to fewer than 2 characters are
+    skipped.
+    """
+    if not ipa_field:
+        return
+    for ipa in ipa_field.split(","):
+        ipa = ipa.strip()
+        if not ipa:
+            continue
+        norm = normalize_ipa(ipa)
+        if len(norm) < 2:
+            continue
+        yield ipa, norm
+
+
+def ipa_key_rows(word, lang, ipa_field):
+    """ipa_keys rows (norm, ipa, word, lang) for one words row"""
+    return [(norm, ipa, word, lang) for ipa, norm in ipa_variants(ipa_field)]
+
+
+def number_ipa_keys(conn, norms=None):
+    """Fill seq for every ipa_keys row, or only for the groups in norms"""
+    if norms is None:
+        conn.execute(NUMBER_IPA_KEYS.format(where=""))
+    else:
+        conn.executemany(
+            NUMBER_IPA_KEYS.format(where="WHERE k.norm = ?"),
+            ((norm,) for norm in sorted(norms))
+        )
+
+
+def ensure_ipa_keys(conn, rebuild=False):
+    """Create and fill ipa_keys in an existing words.db if it is missing or predates seq"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ipa_keys)")}
+    if "seq" in columns and not rebuild:
+        return
+    print("Building ipa_keys table in words.db...")
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS ipa_keys")
+        conn.execute(IPA_KEYS_TABLE)
+        # Reading words while inserting into another table is fine in SQLite
+        rows = conn.execute(
+            "SELECT word, lang, ipa FROM words WHERE ipa IS NOT NULL AND ipa != '' ORDER BY rowid"
+        )
+        conn.executemany(
+            INSERT_IPA_KEY,
+            (key for word, lang, ipa_field in rows for key in ipa_key_rows(word, lang, ipa_field))
+        )
+        number_ipa_keys(conn)
+        for sql in IPA_KEYS_INDEXES:
+            conn.execute(sql)
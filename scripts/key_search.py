@@ -0,0 +1,92 @@
+"""
+Substring search over coincidences.db match keys.
+
+`WHERE match_key LIKE '%q%'` cannot use an index, so every keystroke in
+the search box scans a whole match table. build_coincidence_db.py also
+writes match_key_grams: the distinct trigrams of each spelling and
+normalized-IPA key (with an END marker appended, so every two-character
+substring starts some trigram), as (kind, gram, match_id) postings.
+
+search_keys() looks a query up in the postings and only then checks the
+candidates against the match table:
+
+- A query of three or more characters keeps the matches that have all
+  of its trigrams, then confirms the substring with instr().
+- A two-character query is a range scan over the trigrams that start
+  with it.
+
+Results are ranked exact match first, then keys that start with the
+query, then by number of languages. The same query is built in
+words-studio/search.js. A plain table is used rather than an FTS5
+trigram index so the file works with any SQLite build, including sql.js.
+"""
+
+from match_entries import MATCH_KINDS
+
+GRAM_SIZE = 3
+END = "\x03"  # Appended to each key before splitting it into trigrams
+MAX_CHAR = "\U0010ffff"
+GRAM_KINDS = ("spelling_matches", "pronunciation_matches")
+
+GRAM_TABLE = """
+    CREATE TABLE match_key_grams (
+        kind TEXT NOT NULL,
+        gram TEXT NOT NULL,
+        match_id INTEGER NOT NULL,
+        PRIMARY KEY (kind, gram, match_id)
+    ) WITHOUT ROWID
+"""
+
+INSERT_GRAM = "INSERT INTO match_key_grams VALUES (?, ?, ?)"
+
+
+def key_grams(key):
+    """The distinct trigrams of key + END, in sorted order"""
+    padded = key + END
+    return sorted({padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)})
+
+
+def gram_rows(table, match_id, key):
+    """match_key_grams rows for one match (none for tables without grams)"""
+    if table not in GRAM_KINDS:
+        return []
+    kind = MATCH_KINDS[table]
+    return [(kind, gram, match_id) for gram in key_grams(key)]
+
+
+def search_sql(table, query, limit=100):
+    """SQL and parameters for search_keys(); query must be normalized like the keys"""
+    kind = MATCH_KINDS[table]
+    if len(query) >= GRAM_SIZE:
+        grams = sorted({query[i:i + GRAM_SIZE] for i in range(len(query) - GRAM_SIZE + 1)})
+        candidates = f"""
+            SELECT match_id FROM match_key_grams
+            WHERE kind = ? AND gram IN ({', '.join('?' * len(grams))})
+            GROUP BY match_id
+            HAVING COUNT(*) = ?
+        """
+        params = [kind, *grams, len(grams)]
+    else:
+        candidates = """
+            SELECT DISTINCT match_id FROM match_key_grams
+            WHERE kind = ? AND gram >= ? AND gram <= ?
+        """
+        params = [kind, query, query + MAX_CHAR]
+    sql = f"""
+        SELECT m.match_key, m.languages, m.gloss_overlap, m.entries
+        FROM ({candidates}) c
+        JOIN {table} m ON m.id = c.match_id
+        WHERE instr(m.match_key, ?) > 0
+        ORDER BY m.match_key = ? DESC, substr(m.match_key, 1, ?) = ? DESC,
+                 m.languages DESC, m.match_key
+        LIMIT ?
+    """
+    return sql, [*params, query, query, len(query), query, limit]
+
+
+def search_keys(conn, table, query, limit=100):
+    """Ranked (match_key, languages, gloss_overlap, entries) rows whose key contains query"""
+    if len(query) < 2:
+        return []
+    sql, params = search_sql(table, query, limit)
+    return conn.execute(sql, params).fetchall()
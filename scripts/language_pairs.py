@@ -0,0 +1,101 @@
+"""
+Closely related language pairs (lexical_similarity.csv) for build_coincidence_db.py.
+
+Coincidences between languages like Spanish and Galician are mostly shared
+roots rather than accidents. Instead of dropping every group that contains
+such a pair (which threw away the unrelated languages in the group too),
+RelatedLanguages.prune() drops only the entries that clash:
+
+- Each language named in the CSV is interned to a small integer, and the
+  CSV is compiled into one adjacency bitmask per language (bit j of
+  masks[i] is set when languages i and j are listed together).
+- prune() walks a group once, keeping a bitmask of the listed languages
+  kept so far. An entry whose language is adjacent to one of them is
+  dropped, so the first of two related languages (in group order) stays.
+  The pass is linear in the group size; languages not in the CSV cost one
+  dict lookup.
+
+Every dropped entry is counted in stats once per clashing kept language,
+under "pair:<lang>|<lang>" (names sorted), and report() prints the totals.
+"""
+
+import os
+
+from entry_filters import normalize_language
+
+PAIR_PREFIX = "pair:"
+
+
+class RelatedLanguages:
+    """Interned language ids and their adjacency bitmasks"""
+
+    def __init__(self, pairs=()):
+        self.ids = {}
+        self.names = []
+        self.masks = []
+        for left, right in pairs:
+            a, b = self.intern(left), self.intern(right)
+            if a != b:
+                self.masks[a] |= 1 << b
+                self.masks[b] |= 1 << a
+
+    @classmethod
+    def from_csv(cls, path):
+        """Read "lang, lang" lines; blank lines and # comments are skipped"""
+        pairs = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    raw = line.strip()
+                    if not raw or raw.startswith("#"):
+                        continue
+                    parts = [normalize_language(p) for p in raw.split(",")]
+                    if len(parts) == 2 and all(parts):
+                        pairs.append(parts)
+        return cls(pairs)
+
+    def __len__(self):
+        return sum(bin(mask).count("1") for mask in self.masks) // 2
+
+    def intern(self, name):
+        lang_id = self.ids.get(name)
+        if lang_id is None:
+            lang_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.masks.append(0)
+        return lang_id
+
+    def pair_name(self, a, b):
+        return PAIR_PREFIX + "|".join(sorted((self.names[a], self.names[b])))
+
+    def prune(self, entries, stats):
+        """Return entries without those related to an earlier kept entry's language"""
+        if not self.ids:
+            return entries
+        kept = []
+        kept_mask = 0
+        for entry in entries:
+            lang_id = self.ids.get(normalize_language(entry.get("lang")))
+            if lang_id is not None:
+                clash = self.masks[lang_id] & kept_mask
+                if clash:
+                    while clash:
+                        low = clash & -clash
+                        stats[self.pair_name(lang_id, low.bit_length() - 1)] += 1
+                        clash ^= low
+                    continue
+                kept_mask |= 1 << lang_id
+            kept.append(entry)
+        return kept
+
+    def report(self, stats):
+        """Print the removed-entry counts per language pair, largest first"""
+        removed = sorted(
+            ((count, name[len(PAIR_PREFIX):]) for name, count in stats.items()
+             if name.startswith(PAIR_PREFIX) and count),
+            key=lambda item: (-item[0], item[1]),
+        )
+        total = sum(count for count, _ in removed)
+        print(f"Related language pairs ({len(self):,} listed): removed {total:,} entries")
+        for count, pair in removed:
+            print(f"  - {count:,} by {pair.replace('|', ' / ')}")
@@ -0,0 +1,188 @@
+"""
+Normalized entries of coincidences.db matches.
+
+Each match table keeps its entries as a JSON column (what search.js,
+wander.js and the older scripts read), and build_coincidence_db.py also
+writes one coincidence_entries row per entry, with the language interned
+in a small languages table. The row only holds the ids and the word
+(for match_links); IPA and glosses stay in the JSON column alone, since
+clients download the whole file. Filtering, counting and joining by
+language can then be done in SQL without decoding any JSON, e.g.:
+
+    SELECT m.match_key
+    FROM languages l
+    JOIN coincidence_entries e ON e.lang_id = l.id AND e.kind = 'spelling'
+    JOIN spelling_matches m ON m.id = e.match_id
+    WHERE l.lang = 'Finnish'
+
+language_stats holds each language's spelling and pronunciation
+coincidence counts and its rank by total, so clients can list languages
+with one small query. language_pair_matches lists every spelling and
+pronunciation match under each pair of its languages, e.g. for Explore
+mode's "matches shared by these languages":
+
+    SELECT kind, match_id FROM language_pair_matches
+    WHERE lang_a_id IN (3, 7, 12) AND lang_b_id IN (3, 7, 12)
+
+match_links maps each pronunciation match to the spelling matches that
+contain one of its entries, so a result can be labelled as both kinds
+with a join.
+
+kind says which match table match_id refers to (see MATCH_KINDS). Match
+ids are assigned here rather than by SQLite, so both rows can be queued
+in the same bulk load.
+"""
+
+import json
+from collections import Counter
+
+MATCH_KINDS = {
+    "spelling_matches": "spelling",
+    "pronunciation_matches": "pronunciation",
+    "transliterated_matches": "transliterated",
+    "near_pronunciation_matches": "near",
+}
+
+ENTRY_TABLES = [
+    """
+    CREATE TABLE languages (
+        id INTEGER PRIMARY KEY,
+        lang TEXT NOT NULL UNIQUE,
+        lang_code TEXT
+    )
+    """,
+    """
+    CREATE TABLE coincidence_entries (
+        kind TEXT NOT NULL,
+        match_id INTEGER NOT NULL,
+        lang_id INTEGER NOT NULL REFERENCES languages(id),
+        word TEXT NOT NULL,
+        PRIMARY KEY (kind, match_id, lang_id)  -- reduce_entries keeps one entry per language
+    ) WITHOUT ROWID
+    """,
+]
+
+# The primary key already serves lookups by (kind, match_id)
+ENTRY_INDEXES = [
+    "CREATE INDEX idx_entries_lang ON coincidence_entries(lang_id, kind, match_id)",
+]
+
+# Coincidences per language for the language dropdown and its top-N filter,
+# filled from coincidence_entries once all matches are written
+LANGUAGE_STATS_TABLE = """
+    CREATE TABLE language_stats (
+        lang TEXT PRIMARY KEY,
+        lang_code TEXT,
+        spelling INTEGER NOT NULL,
+        pronunciation INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        rank INTEGER NOT NULL
+    )
+"""
+
+FILL_LANGUAGE_STATS = """
+    INSERT INTO language_stats
+    SELECT lang, lang_code, spelling, pronunciation, spelling + pronunciation,
+           ROW_NUMBER() OVER (ORDER BY spelling + pronunciation DESC, lang)
+    FROM (
+        SELECT l.lang, l.lang_code,
+               SUM(e.kind = 'spelling') AS spelling,
+               SUM(e.kind = 'pronunciation') AS pronunciation
+        FROM coincidence_entries e
+        JOIN languages l ON l.id = e.lang_id
+        WHERE e.kind IN ('spelling', 'pronunciation')
+        GROUP BY l.id
+    )
+"""
+
+# Postings for Explore mode: one row per pair of languages in a spelling or
+# pronunciation match (lang_a_id < lang_b_id), so the matches shared by a
+# set of languages can be looked up without reading any other match
+LANGUAGE_PAIRS_TABLE = """
+    CREATE TABLE language_pair_matches (
+        lang_a_id INTEGER NOT NULL,
+        lang_b_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        match_id INTEGER NOT NULL,
+        PRIMARY KEY (lang_a_id, lang_b_id, kind, match_id)
+    ) WITHOUT ROWID
+"""
+
+FILL_LANGUAGE_PAIRS = """
+    INSERT INTO language_pair_matches
+    SELECT a.lang_id, b.lang_id, a.kind, a.match_id
+    FROM coincidence_entries a
+    JOIN coincidence_entries b
+      ON b.kind = a.kind AND b.match_id = a.match_id AND b.lang_id > a.lang_id
+    WHERE a.kind IN ('spelling', 'pronunciation')
+    ORDER BY 1, 2, 3, 4
+"""
+
+# Pronunciation matches and the spelling matches they share an entry with
+# (the same word in the same language), one row per shared language
+MATCH_LINKS_TABLE = """
+    CREATE TABLE match_links (
+        pronunciation_id INTEGER NOT NULL,
+        spelling_id INTEGER NOT NULL,
+        lang_id INTEGER NOT NULL,
+        PRIMARY KEY (pronunciation_id, spelling_id, lang_id)
+    ) WITHOUT ROWID
+"""
+
+# The materialized spelling entries get an automatic (lang_id, word) index
+# whether or not the coincidence_entries indexes exist yet
+FILL_MATCH_LINKS = """
+    INSERT INTO match_links
+    WITH spelling AS MATERIALIZED (
+        SELECT match_id, lang_id, word FROM coincidence_entries WHERE kind = 'spelling'
+    )
+    SELECT p.match_id, s.match_id, p.lang_id
+    FROM coincidence_entries p
+    JOIN spelling s ON s.lang_id = p.lang_id AND s.word = p.word
+    WHERE p.kind = 'pronunciation'
+    ORDER BY 1, 2, 3
+"""
+
+INSERT_ENTRY = "INSERT INTO coincidence_entries (kind, match_id, lang_id, word) VALUES (?, ?, ?, ?)"
+INSERT_LANGUAGE = "INSERT INTO languages VALUES (?, ?, ?)"
+
+
+class MatchEntries:
+    """Match ids and language ids for coincidence_entries rows"""
+
+    def __init__(self):
+        self.last_ids = Counter()
+        self.lang_ids = {}
+        self.new_languages = []
+
+    @classmethod
+    def from_db(cls, conn):
+        """Continue the languages table of an existing coincidences.db"""
+        entries = cls()
+        for lang_id, lang in conn.execute("SELECT id, lang FROM languages"):
+            entries.lang_ids[lang] = lang_id
+        return entries
+
+    def next_id(self, table):
+        self.last_ids[table] += 1
+        return self.last_ids[table]
+
+    def lang_id(self, lang, lang_code):
+        lang_id = self.lang_ids.get(lang)
+        if lang_id is None:
+            lang_id = self.lang_ids[lang] = len(self.lang_ids) + 1
+            self.new_languages.append((lang_id, lang, lang_code))
+        return lang_id
+
+    def rows(self, table, match_id, entries_json):
+        """coincidence_entries rows for one match's JSON entries column"""
+        kind = MATCH_KINDS[table]
+        return [
+            (kind, match_id, self.lang_id(entry["lang"], entry.get("lang_code")), entry["word"])
+            for entry in json.loads(entries_json)
+        ]
+
+    def take_languages(self):
+        """languages rows interned since the last call"""
+        rows, self.new_languages = self.new_languages, []
+        return rows
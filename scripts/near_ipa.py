@@ -0,0 +1,74 @@
+"""
+Near-homophone key pairs for build_coincidence_db.py.
+
+Finds every pair of normalized IPA keys at edit distance 1 (one
+substitution, insertion or deletion) without comparing all pairs, using
+deletion neighbourhoods:
+
+- Two keys of the same length differ by one substitution exactly when
+  deleting the same position from both gives the same string, so keys are
+  bucketed by (position, key with that position deleted).
+- A key is one insertion away from a longer key exactly when it equals one
+  of the longer key's single-character deletions.
+
+Both tests are exact, so no pair needs verifying afterwards. Keys are
+processed one length at a time and only keys of lengths L - 1 and L are
+held in memory. Each key produces L variants, so the work grows with the
+number of keys times their length plus the number of pairs found, not
+with the square of the number of keys.
+
+Compare against brute-force pairwise comparison with:
+    python scripts/bench_near_ipa.py
+"""
+
+from collections import defaultdict
+from itertools import combinations
+
+NEAR_MIN_LENGTH = 4  # Shorter keys are one edit away from far too many others
+
+
+def deletions(key):
+    """Yield (position, key without that position)"""
+    for i in range(len(key)):
+        yield i, key[:i] + key[i + 1:]
+
+
+def substitution_pairs(keys):
+    """Pairs of equal-length keys that differ in exactly one position"""
+    buckets = defaultdict(list)
+    for key in keys:
+        for variant in deletions(key):
+            buckets[variant].append(key)
+    for bucket in buckets.values():
+        if len(bucket) > 1:
+            yield from combinations(bucket, 2)
+
+
+def insertion_pairs(shorter, keys):
+    """Pairs (short, key) where short is key with one character deleted"""
+    for key in keys:
+        found = set()
+        for _, variant in deletions(key):
+            # Deleting either of two repeated characters gives the same variant
+            if variant in shorter and variant not in found:
+                found.add(variant)
+                yield variant, key
+
+
+def near_pairs(keys_by_length):
+    """Yield (a, b) key pairs at edit distance 1, with a < b.
+
+    keys_by_length is an iterable of (length, keys) in ascending length
+    order. Pairs come out sorted within each length, so the output order
+    is deterministic.
+    """
+    previous = set()
+    previous_length = None
+    for length, keys in keys_by_length:
+        keys = sorted(set(keys))
+        pairs = list(substitution_pairs(keys))
+        if previous_length == length - 1:
+            pairs.extend(insertion_pairs(previous, keys))
+        yield from sorted(tuple(sorted(pair)) for pair in pairs)
+        previous = set(keys)
+        previous_length = length
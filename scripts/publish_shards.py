@@ -0,0 +1,217 @@
+"""
+Publish coincidences.db as small, separately fetchable shards.
+
+Runs after build_coincidence_db.py. Instead of one coincidences.db.gz that
+every page downloads and loads into sql.js before showing anything, it
+writes gzipped JSON shards plus a manifest into data/shards/:
+
+- Key shards (spelling-0000.json.gz, pronunciation-0000.json.gz, ...):
+  the matches of one table sorted by match_key and cut into ranges of
+  about --shard-rows matches. A search for a key or key prefix only needs
+  the shards whose [first_key, last_key] range can contain it.
+- Language shards (lang-0000.json.gz, ...): the spelling and
+  pronunciation matches of one or more languages, packed in language_stats
+  rank order until a shard holds about --shard-rows matches. A language
+  with more matches gets a shard to itself. Explore mode for two
+  languages needs at most two of them.
+- manifest.json: for every shard its file, kind, key range or languages,
+  row count, size and SHA-256, plus the language_stats rows so the
+  language dropdown needs no shard at all.
+
+Each row is [match_key, languages, gloss_overlap, entries] with entries
+decoded (the JSON column of coincidences.db). In a language shard,
+"languages" maps each language to the indexes of its rows in the
+shard's "spelling" and "pronunciation" arrays. Keys are ordered by code
+point. The output is deterministic (sorted, gzip mtime 0), so unchanged
+shards keep their hashes and can stay cached. The new directory is
+swapped in only once it is complete.
+
+Usage:
+    python scripts/publish_shards.py [--shard-rows N] [--output DIR]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+
+SOURCE_DB = "data/coincidences.db"
+OUTPUT_DIR = "data/shards"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+SHARD_ROWS = 2000
+SHARD_TABLES = {"spelling": "spelling_matches", "pronunciation": "pronunciation_matches"}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_shard(out_dir, name, payload):
+    """Write one gzipped JSON shard; return its file, size and hash"""
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    blob = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(os.path.join(out_dir, name), "wb") as handle:
+        handle.write(blob)
+    return {
+        "file": name,
+        "bytes": len(blob),
+        "raw_bytes": len(data),
+        "sha256": hashlib.sha256(blob).hexdigest(),
+    }
+
+
+def load_rows(conn, table):
+    """{match id: [match_key, languages, gloss_overlap, entries]}"""
+    return {
+        match_id: [key, languages, overlap, json.loads(entries)]
+        for match_id, key, languages, overlap, entries in conn.execute(
+            f"SELECT id, match_key, languages, gloss_overlap, entries FROM {table}"
+        )
+    }
+
+
+def key_shards(out_dir, kind, rows, shard_rows):
+    """Cut one table's rows into match_key ranges of about shard_rows rows"""
+    ordered = sorted(rows.values(), key=lambda row: row[0])
+    shards = []
+    for start in range(0, len(ordered), shard_rows):
+        chunk = ordered[start:start + shard_rows]
+        name = f"{kind}-{len(shards):04d}.json.gz"
+        shard = write_shard(out_dir, name, {"kind": kind, "rows": chunk})
+        shard.update(kind=kind, first_key=chunk[0][0], last_key=chunk[-1][0], rows=len(chunk))
+        shards.append(shard)
+    return shards
+
+
+def language_matches(conn):
+    """[(lang, {kind: [match ids]})] in language_stats rank order"""
+    languages = []
+    for lang_id, lang in conn.execute("""
+        SELECT l.id, l.lang FROM language_stats s
+        JOIN languages l ON l.lang = s.lang
+        ORDER BY s.rank
+    """):
+        matches = {kind: [] for kind in SHARD_TABLES}
+        for kind, match_id in conn.execute(
+            "SELECT kind, match_id FROM coincidence_entries WHERE lang_id = ? ORDER BY kind, match_id",
+            (lang_id,)
+        ):
+            if kind in matches:
+                matches[kind].append(match_id)
+        languages.append((lang, matches))
+    return languages
+
+
+def language_shards(out_dir, languages, rows, shard_rows):
+    """Pack languages into shards of about shard_rows distinct matches"""
+    shards = []
+    pending = []
+    pending_ids = {kind: set() for kind in SHARD_TABLES}
+
+    def flush():
+        ids = {kind: sorted(pending_ids[kind]) for kind in SHARD_TABLES}
+        index = {kind: {match_id: i for i, match_id in enumerate(ids[kind])} for kind in SHARD_TABLES}
+        payload = {
+            "kind": "language",
+            "languages": {
+                lang: {kind: [index[kind][match_id] for match_id in matches[kind]] for kind in SHARD_TABLES}
+                for lang, matches in pending
+            },
+        }
+        for kind in SHARD_TABLES:
+            payload[kind] = [rows[kind][match_id] for match_id in ids[kind]]
+        shard = write_shard(out_dir, f"lang-{len(shards):04d}.json.gz", payload)
+        shard.update(
+            kind="language",
+            languages=[lang for lang, _ in pending],
+            rows=sum(len(ids[kind]) for kind in SHARD_TABLES),
+        )
+        shards.append(shard)
+        pending.clear()
+        for kind in SHARD_TABLES:
+            pending_ids[kind].clear()
+
+    for lang, matches in languages:
+        size = sum(len(pending_ids[kind]) for kind in SHARD_TABLES)
+        added = sum(len(set(matches[kind]) - pending_ids[kind]) for kind in SHARD_TABLES)
+        if pending and size + added > shard_rows:
+            flush()
+        pending.append((lang, matches))
+        for kind in SHARD_TABLES:
+            pending_ids[kind].update(matches[kind])
+    if pending:
+        flush()
+    return shards
+
+
+def publish(source=SOURCE_DB, out_dir=OUTPUT_DIR, shard_rows=SHARD_ROWS):
+    if not os.path.exists(source):
+        raise SystemExit(f"Missing {source}; run build_coincidence_db.py first")
+    conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "language_stats" not in tables or "coincidence_entries" not in tables:
+        raise SystemExit(f"{source} predates language_stats/coincidence_entries; rebuild it first")
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        rows = {kind: load_rows(conn, table) for kind, table in SHARD_TABLES.items()}
+        shards = []
+        for kind in SHARD_TABLES:
+            shards.extend(key_shards(tmp_dir, kind, rows[kind], shard_rows))
+            print(f"[{kind}] {len(rows[kind]):,} matches in {sum(s['kind'] == kind for s in shards):,} shards")
+        languages = language_matches(conn)
+        lang_shards = language_shards(tmp_dir, languages, rows, shard_rows)
+        shards.extend(lang_shards)
+        print(f"[language] {len(languages):,} languages in {len(lang_shards):,} shards")
+        stats = conn.execute("""
+            SELECT lang, lang_code, spelling, pronunciation, total, rank
+            FROM language_stats ORDER BY rank
+        """).fetchall()
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "source": {
+                "file": os.path.basename(source),
+                "bytes": os.path.getsize(source),
+                "sha256": file_sha256(source),
+            },
+            "shard_rows": shard_rows,
+            "row_format": ["match_key", "languages", "gloss_overlap", "entries"],
+            "language_stats": stats,
+            "shards": shards,
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=1)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    total = sum(shard["bytes"] for shard in shards)
+    largest = max((shard["bytes"] for shard in shards), default=0)
+    print(f"✓ Wrote {len(shards):,} shards to {out_dir} ({total / 1024 / 1024:.1f} MB total, "
+          f"largest {largest / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish coincidences.db as shards with a manifest")
+    parser.add_argument("--source", default=SOURCE_DB, help=f"Database to publish (default: {SOURCE_DB})")
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"Shard directory (default: {OUTPUT_DIR})")
+    parser.add_argument(
+        "--shard-rows",
+        type=int,
+        default=SHARD_ROWS,
+        help=f"Target matches per shard (default: {SHARD_ROWS})",
+    )
+    args = parser.parse_args()
+    publish(args.source, args.output, args.shard_rows)
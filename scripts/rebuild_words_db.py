@@ -5,14 +5,19 @@ This script:
 1. Reads the raw wiktextract JSONL file
 2. Aggregates ALL glosses for each (word, lang) pair
 3. Handles IPA by keeping the first non-empty value
-4. Writes to a new SQLite database
+4. Bulk-loads a new SQLite database and atomically swaps it into place,
+   or with --update applies only the changed rows to the existing one
 
 Usage:
-    python scripts/rebuild_words_db.py
+    python scripts/rebuild_words_db.py [--workers N] [--languages L1,L2] [--exclude-languages L3]
+                                       [--aggregate {sqlite,external}] [--memory-mb MB]
+                                       [--resume] [--checkpoint-every SECONDS] [--update]
 
 Requires:
     - Raw data file at ~/Development/raw-wiktextract-data.jsonl
     - Or set RAW_DATA environment variable to the path
+    - The file may be compressed (.gz, .bz2, .xz, or .zst with the
+      zstandard package installed); it is decompressed on the fly
 
 Known Issues:
     - Some native words may be incorrectly filtered as loanwords (e.g., Spanish "pato" 
@@ -21,12 +26,37 @@ Known Issues:
       have false positives.
 """
 
+import argparse
+import bz2
+import gzip
+import hashlib
+import io
 import json
+import lzma
+import multiprocessing
 import os
+import queue
 import re
 import sqlite3
+import threading
+import time
 import unicodedata
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+
+from bulk_load import BulkWriter
+from entry_filters import FilterEngine
+from ipa_keys import (
+    INSERT_IPA_KEY,
+    IPA_KEYS_INDEXES,
+    IPA_KEYS_TABLE,
+    NUMBER_IPA_KEYS,
+    ensure_ipa_keys,
+    ipa_key_rows,
+    ipa_variants,
+    number_ipa_keys,
+)
+from staging import ExternalSortStaging, SqliteStaging
+from transliterate import TRANSLIT_INDEX, ensure_translit, translit_key
 
 # Configuration
 RAW_DATA = os.environ.get(
@@ -34,7 +64,48 @@ RAW_DATA = os.environ.get(
     os.path.expanduser("~/Development/raw-wiktextract-data.jsonl")
 )
 DB_FILE = "data/words.db"
-DB_FILE_NEW = "data/words_new.db"
+DB_FILE_NEW = "data/words_new.db"  # Built here, then renamed over DB_FILE
+TEMP_DB = "data/words_temp.db"
+RUN_DIR = "data/words_runs"
+CHECKPOINT_SECONDS = 300  # How often the staging state is checkpointed
+CHANGES_FILE = "data/words_changes.jsonl"  # Keys touched by an --update run
+SHARD_SIZE = 4 * 1024 * 1024  # Bytes of raw JSONL per worker task (bounds each result)
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+READ_BATCH_LINES = 20000  # Lines per batch handed from the reader thread
+READ_QUEUE_BATCHES = 8  # Decoded batches buffered ahead of the parser
+
+# Optional language filters (exact wiktextract "lang" names), e.g.
+# LANGUAGES = {"English", "Norwegian Bokmål", "French", "Spanish"}
+# None keeps every language. Both can be overridden on the command line.
+LANGUAGES = None
+EXCLUDED_LANGUAGES = set()
+
+WORDS_TABLE = """
+    CREATE TABLE words (
+        word TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        lang_code TEXT,
+        ipa TEXT,
+        glosses TEXT,
+        translit TEXT,  -- Romanized, accent-folded word (see transliterate.py)
+        UNIQUE(word, lang)
+    )
+"""
+WORDS_INDEXES = [
+    "CREATE INDEX idx_word ON words(word)",
+    "CREATE INDEX idx_lang ON words(lang)",
+    TRANSLIT_INDEX,
+]
+
+# Compiled filter rules (see entry_filters.py)
+WORD_FILTERS = FilterEngine(["short", "affix", "digits"])
+ENTRY_FILTERS = FilterEngine(["loanword"])
+
+# Raw-bytes field lookups for the prefilter. A key is only trusted when it
+# occurs exactly once in the line, because "word" and "lang" also appear
+# nested inside forms, translations, etc.
+WORD_FIELD = re.compile(rb'"word"\s*:\s*"((?:[^"\\]|\\.)*)"')
+LANG_FIELD = re.compile(rb'"lang"\s*:\s*"((?:[^"\\]|\\.)*)"')
 
 def norm(s):
     """Normalize unicode and lowercase"""
@@ -108,50 +179,434 @@ def extract_ipa(entry):
         return None
 
 
-def is_affix(word):
-    """Check if word is a prefix or suffix (starts or ends with hyphen)"""
-    return word.startswith("-") or word.endswith("-")
+def is_wanted_language(lang, languages=None, excluded_languages=None):
+    """Check a language name against the optional allowlist/denylist"""
+    if languages is not None and lang not in languages:
+        return False
+    return not (excluded_languages and lang in excluded_languages)
 
 
-def has_digits(word):
-    """Check if word contains any digits (e.g., '4x4', '311')"""
-    return any(c.isdigit() for c in word)
+def raw_string_field(line, key, pattern):
+    """Pull a top-level string field out of a raw JSONL line without decoding it.
+    
+    Returns None when the field can't be located unambiguously (missing,
+    repeated in nested objects, or not a string), in which case the caller
+    must fall back to a full json.loads.
+    """
+    if line.count(key) != 1:
+        return None
+    match = pattern.search(line)
+    if not match:
+        return None
+    try:
+        return json.loads(b'"' + match.group(1) + b'"')
+    except ValueError:
+        return None
 
 
-def is_loanword(entry):
-    """Check if entry is a loanword based on etymology or categories.
+def prefilter_line(line, stats, languages=None, excluded_languages=None):
+    """Cheap rejection of raw lines before json.loads.
     
-    Two methods of detection:
-    1. Etymology: Detects phrases like "borrowed from" and "unadapted borrowing from"
-       at the BEGINNING of the etymology text, which indicate the word was 
-       taken from another language. If these phrases appear later in the 
-       etymology (e.g., referring to an older root), the entry is not 
-       considered a loanword.
-    2. Categories: Checks for Wiktionary categories like "English terms borrowed from French"
-       which explicitly mark borrowed terms.
+    Only rejects lines that the full parse would also reject, so the
+    output is unchanged; anything uncertain is passed through. Returns
+    True if the line should be decoded.
     """
-    # Check categories first (more reliable)
-    categories = entry.get("categories", [])
-    if categories:
-        lang = entry.get("lang", "").strip()
-        for cat in categories:
-            cat_lower = cat.lower()
-            # Match patterns like "English terms borrowed from French"
-            if lang.lower() in cat_lower and "terms borrowed from" in cat_lower:
-                return True
-    
-    # Check etymology text
-    etymology = entry.get("etymology_text", "") or entry.get("etymology", "")
-    if not etymology:
+    # No senses with glosses anywhere in the line
+    if b'"glosses"' not in line:
+        stats["pre_no_glosses"] += 1
         return False
-    etymology_lower = etymology.lower().strip()
-    # Only match if borrowing phrases appear at the very beginning
-    return (etymology_lower.startswith("borrowed from") or 
-            etymology_lower.startswith("unadapted borrowing from") or
-            etymology_lower.startswith("borrowing from"))
+    
+    word = raw_string_field(line, b'"word"', WORD_FIELD)
+    if word is not None and WORD_FILTERS.check(norm(word), stats, prefix="pre_"):
+        return False
+    
+    if languages is not None or excluded_languages:
+        lang = raw_string_field(line, b'"lang"', LANG_FIELD)
+        if lang is not None and not is_wanted_language(
+            lang.strip(), languages, excluded_languages
+        ):
+            stats["pre_languages"] += 1
+            return False
+    
+    return True
+
+
+def parse_line(line, stats, languages=None, excluded_languages=None):
+    """Parse one raw JSONL line into staging rows.
+    
+    Returns a list of (word, lang, lang_code, ipa, gloss) tuples, one per
+    gloss. Skipped entries return an empty list and bump the matching
+    counter in `stats`.
+    """
+    if not line.strip():
+        return []
+    
+    stats["lines"] += 1
+    if not prefilter_line(line, stats, languages, excluded_languages):
+        return []
+    
+    stats["decoded"] += 1
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return []
+    
+    word = norm(entry.get("word", ""))
+    lang = entry.get("lang", "").strip()
+    lang_code = entry.get("lang_code", "").strip()
+    
+    # Skip short words, prefixes/suffixes (e.g., "-able", "un-") and
+    # words with digits (e.g., "4x4", "311")
+    if WORD_FILTERS.check(word, stats):
+        return []
+    
+    # Skip languages outside the allowlist/denylist
+    if not is_wanted_language(lang, languages, excluded_languages):
+        stats["languages"] += 1
+        return []
+    
+    # Skip loanwords (etymology contains "borrowed from")
+    if ENTRY_FILTERS.check(entry, stats):
+        return []
+    
+    glosses = extract_glosses(entry)
+    if not glosses:
+        stats["no_glosses"] += 1
+        return []
+    
+    ipa = extract_ipa(entry)
+    
+    # Add each gloss as a separate row (will dedupe on insert)
+    rows = []
+    for gloss in glosses:
+        gloss = gloss.strip()
+        if gloss:
+            rows.append((word, lang, lang_code, ipa, gloss))
+    
+    stats["count"] += 1
+    return rows
+
+
+def iter_range(path, start, end, languages=None, excluded_languages=None):
+    """Yield (offset, rows, stats) batches for the lines in bytes [start, end) of path.
+    
+    start and end must fall on line boundaries (see shard_ranges). offset
+    is the byte position just past the last line in the batch.
+    """
+    stats = Counter()
+    rows = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            rows.extend(parse_line(line, stats, languages, excluded_languages))
+            if len(rows) >= 50000:
+                yield pos, rows, stats
+                stats = Counter()
+                rows = []
+    if rows or stats:
+        yield pos, rows, stats
+
+
+def parse_shard(shard):
+    """Worker entry point: parse one (path, start, end, languages, excluded) shard in full."""
+    rows = []
+    stats = Counter()
+    for _, batch, batch_stats in iter_range(*shard):
+        rows.extend(batch)
+        stats.update(batch_stats)
+    return shard[2], rows, stats
+
+
+def shard_ranges(path, shards, languages=None, excluded_languages=None, start=0):
+    """Split path[start:] into byte ranges whose boundaries fall just after a newline.
+    
+    Each boundary is moved forward to the start of the next line, so every
+    line belongs to exactly one shard.
+    """
+    size = os.path.getsize(path)
+    boundaries = [start]
+    with open(path, "rb") as f:
+        for i in range(1, shards):
+            f.seek(max(start + (size - start) * i // shards, boundaries[-1]))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+    boundaries.append(size)
+    return [
+        (path, start, end, languages, excluded_languages)
+        for start, end in zip(boundaries, boundaries[1:])
+        if start < end
+    ]
+
+
+def open_raw(path):
+    """Open the raw dump for binary reading, decompressing by file extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("Reading .zst dumps needs the zstandard package (pip install zstandard)")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+def read_batches(path, start, out, reader_stats):
+    """Reader thread: decompress path and queue (offset, lines) batches.
+    
+    Offsets count decompressed bytes, so checkpoints work the same as for
+    plain files; lines before start are decompressed and dropped. The
+    thread ends by queueing None, or the exception that stopped it.
+    """
+    pos = 0
+    busy = 0.0
+    try:
+        with open_raw(path) as f:
+            lines = []
+            began = time.perf_counter()
+            for line in f:
+                pos += len(line)
+                if pos <= start:
+                    continue
+                lines.append(line)
+                if len(lines) >= READ_BATCH_LINES:
+                    busy += time.perf_counter() - began
+                    out.put((pos, lines))  # Blocks while the parser catches up
+                    lines = []
+                    began = time.perf_counter()
+            busy += time.perf_counter() - began
+            if lines:
+                out.put((pos, lines))
+    except BaseException as exc:
+        out.put(exc)
+    finally:
+        reader_stats["bytes"] = pos - min(start, pos)
+        reader_stats["seconds"] = busy
+        out.put(None)
+
+
+def imap_bounded(pool, func, tasks, window):
+    """Like pool.imap, but with at most window tasks in flight.
+    
+    pool.imap submits every task up front, so parsed rows pile up in the
+    parent whenever the consumer (staging inserts) falls behind.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def parse_batch(batch):
+    """Worker entry point: parse one (offset, lines, languages, excluded) batch"""
+    offset, lines, languages, excluded_languages = batch
+    rows = []
+    stats = Counter()
+    for line in lines:
+        rows.extend(parse_line(line, stats, languages, excluded_languages))
+    return offset, rows, stats
+
+
+def ingest_stream(path, workers, languages, excluded_languages, start, reader_stats):
+    """Yield (offset, rows, stats) batches from a compressed dump.
+    
+    Decompression runs in a background thread feeding a bounded queue, so
+    it overlaps with parsing instead of alternating with it.
+    """
+    batches = queue.Queue(maxsize=READ_QUEUE_BATCHES)
+    reader = threading.Thread(
+        target=read_batches,
+        args=(path, start, batches, reader_stats),
+        daemon=True,
+    )
+    reader.start()
+    
+    def queued():
+        while True:
+            item = batches.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            offset, lines = item
+            yield offset, lines, languages, excluded_languages
+    
+    if workers <= 1:
+        for batch in queued():
+            yield parse_batch(batch)
+        return
+    # Keep a bounded window of batches in flight, yielded in order
+    with multiprocessing.Pool(workers) as pool:
+        yield from imap_bounded(pool, parse_batch, queued(), workers * 2)
+
+
+def ingest(
+    path,
+    workers=1,
+    languages=None,
+    excluded_languages=None,
+    start=0,
+    reader_stats=None,
+):
+    """Yield (offset, rows, stats) batches for the raw dump, in file order.
+    
+    With more than one worker, the file is split into newline-aligned
+    shards of about SHARD_SIZE bytes that are parsed in a process pool.
+    Results come back in shard order, so the staging table is filled in
+    the same order as a single-process run. At most workers * 2 shards are
+    in flight, so parent memory stays flat however large the dump is.
+    
+    start resumes reading at a line boundary recorded by a checkpoint.
+    
+    Compressed dumps (.gz, .bz2, .xz, .zst) can't be split by byte range;
+    they are streamed through a decompression thread instead (see
+    ingest_stream), which fills reader_stats with its throughput.
+    """
+    if path.endswith(COMPRESSED_SUFFIXES):
+        yield from ingest_stream(
+            path, workers, languages, excluded_languages, start,
+            reader_stats if reader_stats is not None else {},
+        )
+        return
+    size = os.path.getsize(path)
+    if workers <= 1:
+        yield from iter_range(path, start, size, languages, excluded_languages)
+        return
+    shards = max(workers, -(-(size - start) // SHARD_SIZE))
+    with multiprocessing.Pool(workers) as pool:
+        yield from imap_bounded(
+            pool,
+            parse_shard,
+            shard_ranges(path, shards, languages, excluded_languages, start),
+            workers * 2,
+        )
+
+
+def row_hash(row):
+    """Content hash of an aggregated words row (lang_code, ipa, glosses)"""
+    _, _, lang_code, ipa, glosses = row
+    payload = json.dumps([lang_code, ipa, glosses], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf8")).digest()
+
+
+def diff_words(new_rows, old_rows):
+    """Merge-join two words row streams sorted by (word, lang).
+    
+    Yields (op, old_row, new_row) with op "insert", "update" or "delete"
+    for every key whose row hash changed; unchanged rows are skipped.
+    """
+    new_rows = iter(new_rows)
+    old_rows = iter(old_rows)
+    new = next(new_rows, None)
+    old = next(old_rows, None)
+    while new is not None or old is not None:
+        if old is None or (new is not None and tuple(new[:2]) < tuple(old[:2])):
+            yield "insert", None, new
+            new = next(new_rows, None)
+        elif new is None or tuple(old[:2]) < tuple(new[:2]):
+            yield "delete", old, None
+            old = next(old_rows, None)
+        else:
+            if row_hash(new) != row_hash(old):
+                yield "update", old, new
+            new = next(new_rows, None)
+            old = next(old_rows, None)
+
+
+def update_words_db(rows, db_path=DB_FILE, changes_path=CHANGES_FILE):
+    """Apply a freshly aggregated dump to an existing words.db in place.
+    
+    Only inserted, changed and vanished (word, lang) rows are written, in a
+    single transaction, together with their ipa_keys rows. The touched
+    keys are logged to changes_path as JSON lines:
+    {"op", "word", "lang", "old_ipa", "ipa"}.
+    """
+    conn = sqlite3.connect(db_path)
+    ensure_ipa_keys(conn)
+    ensure_translit(conn)
+    old_rows = conn.execute(
+        "SELECT word, lang, lang_code, ipa, glosses FROM words ORDER BY word, lang"
+    )
+    changes = list(diff_words(rows, old_rows))
+    counts = Counter(op for op, _, _ in changes)
+    
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO words (word, lang, lang_code, ipa, glosses, translit)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(word, lang) DO UPDATE SET
+                lang_code = excluded.lang_code,
+                ipa = excluded.ipa,
+                glosses = excluded.glosses
+            """,
+            [(*new, translit_key(new[0])) for op, _, new in changes if op != "delete"]
+        )
+        conn.executemany(
+            "DELETE FROM words WHERE word = ? AND lang = ?",
+            [tuple(old[:2]) for op, old, _ in changes if op == "delete"]
+        )
+        conn.executemany(
+            "DELETE FROM ipa_keys WHERE word = ? AND lang = ?",
+            [tuple(old[:2]) for op, old, _ in changes if op != "insert"]
+        )
+        conn.executemany(
+            INSERT_IPA_KEY,
+            [key for op, _, new in changes if op != "delete" for key in ipa_key_rows(new[0], new[1], new[3])]
+        )
+        # Renumber the groups that gained, lost or reordered rows
+        number_ipa_keys(conn, {
+            norm
+            for _, old, new in changes
+            for row in (old, new) if row is not None
+            for _, norm in ipa_variants(row[3])
+        })
+    total = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+    conn.close()
+    
+    tmp_path = changes_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as log:
+        for op, old, new in changes:
+            key = new if new is not None else old
+            log.write(json.dumps({
+                "op": op,
+                "word": key[0],
+                "lang": key[1],
+                "old_ipa": old[3] if old is not None else None,
+                "ipa": new[3] if new is not None else None,
+            }, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, changes_path)
+    
+    print(f"✓ Updated {db_path} ({total:,} entries)")
+    print(f"  - Inserted {counts['insert']:,}")
+    print(f"  - Updated {counts['update']:,}")
+    print(f"  - Deleted {counts['delete']:,}")
+    print(f"  Change log written to {changes_path}")
 
 
-def process_data():
+def process_data(
+    workers=1,
+    languages=LANGUAGES,
+    excluded_languages=EXCLUDED_LANGUAGES,
+    aggregate="sqlite",
+    memory_mb=1024,
+    resume=False,
+    checkpoint_every=CHECKPOINT_SECONDS,
+    update=False,
+):
     """
     Process raw data with proper aggregation.
     
@@ -159,200 +614,168 @@ def process_data():
     1. First pass: collect all glosses for each (word, lang) pair in memory
     2. Second pass: write aggregated data to database
     
-    For very large datasets, we store intermediate results in a temp SQLite DB.
+    For very large datasets, we store intermediate results on disk: either a
+    temp SQLite DB (aggregate="sqlite") or sorted runs that are k-way merged
+    (aggregate="external", kept under memory_mb of buffered rows). Both
+    produce the same words table; see staging.py.
+    
+    With workers > 1 the first pass is parsed by a process pool over
+    byte-range shards of the raw file (see ingest). Lines are prefiltered
+    on their raw bytes so most rejected entries are never JSON-decoded.
+    
+    Every checkpoint_every seconds the staging state is committed together
+    with the byte offset and skip counters. With resume=True a killed run
+    picks up from its last checkpoint instead of re-reading the dump.
+    
+    With update=True the second pass diffs the aggregated rows against the
+    existing DB_FILE and applies only the changes (see update_words_db).
     """
     if not os.path.exists(RAW_DATA):
         print(f"Error: Raw data file not found at {RAW_DATA}")
         print("Set RAW_DATA environment variable to the correct path")
         return
+    if update and not os.path.exists(DB_FILE):
+        print(f"Error: --update needs an existing database at {DB_FILE}")
+        return
     
     os.makedirs("data", exist_ok=True)
     
-    # Remove old new db if exists
-    if os.path.exists(DB_FILE_NEW):
-        os.remove(DB_FILE_NEW)
-    
-    # Use a file-based temp database to avoid memory issues on older machines
-    temp_db_path = "data/words_temp.db"
-    if os.path.exists(temp_db_path):
-        os.remove(temp_db_path)
-    
-    temp_db = sqlite3.connect(temp_db_path)
-    temp_db.execute("PRAGMA journal_mode=WAL")  # Better write performance
-    temp_db.execute("PRAGMA synchronous=NORMAL")  # Faster, still safe
-    temp_db.execute("""
-        CREATE TABLE entries (
-            word TEXT NOT NULL,
-            lang TEXT NOT NULL,
-            lang_code TEXT,
-            ipa TEXT,
-            gloss TEXT NOT NULL,
-            PRIMARY KEY (word, lang, gloss)
-        )
-    """)
-    temp_db.execute("CREATE INDEX idx_word_lang ON entries(word, lang)")
+    if aggregate == "external":
+        # Sorted runs on disk, merged at the end (no staging B-tree)
+        staging = ExternalSortStaging(RUN_DIR, memory_mb=memory_mb, resume=resume)
+    else:
+        # Use a file-based temp database to avoid memory issues on older machines
+        staging = SqliteStaging(TEMP_DB, resume=resume)
+    
+    # The checkpoint is only valid for the same input and filters
+    source = {
+        "raw_data": os.path.abspath(RAW_DATA),
+        "size": os.path.getsize(RAW_DATA),
+        "mtime": int(os.path.getmtime(RAW_DATA)),
+        "languages": sorted(languages) if languages is not None else None,
+        "excluded_languages": sorted(excluded_languages or ()),
+    }
+    offset = 0
+    stats = Counter()
+    if resume:
+        state = staging.checkpoint_state()
+        if state is None:
+            print("No checkpoint found, starting from the beginning")
+        elif state["source"] != source:
+            raise SystemExit(
+                "Checkpoint was written for a different input file or language "
+                "filters; rerun without --resume"
+            )
+        else:
+            offset = state["offset"]
+            stats = Counter(state["stats"])
+            print(f"Resuming at byte {offset:,} ({stats['count']:,} entries already staged)")
     
     print(f"Reading from {RAW_DATA}...")
+    if workers > 1:
+        print(f"  Using {workers} worker processes")
+    if languages is not None:
+        print(f"  Keeping only: {', '.join(sorted(languages))}")
+    if excluded_languages:
+        print(f"  Excluding: {', '.join(sorted(excluded_languages))}")
     
     # First pass: collect all entries
-    count = 0
-    skipped = 0
-    skipped_affixes = 0
-    skipped_digits = 0
-    skipped_loanwords = 0
     batch = []
+    last_checkpoint = time.monotonic()
+    ingest_start = offset
+    ingest_began = time.perf_counter()
+    reader_stats = {}
     
-    with open(RAW_DATA, "r", encoding="utf8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            
-            word = norm(entry.get("word", ""))
-            lang = entry.get("lang", "").strip()
-            lang_code = entry.get("lang_code", "").strip()
-            
-            # Skip short words
-            if not word or len(word) <= 2:
-                skipped += 1
-                continue
-            
-            # Skip prefixes and suffixes (e.g., "-able", "un-")
-            if is_affix(word):
-                skipped_affixes += 1
-                continue
-            
-            # Skip words with digits (e.g., "4x4", "311")
-            if has_digits(word):
-                skipped_digits += 1
-                continue
-            
-            # Skip loanwords (etymology contains "borrowed from")
-            if is_loanword(entry):
-                skipped_loanwords += 1
-                continue
-            
-            glosses = extract_glosses(entry)
-            if not glosses:
-                skipped += 1
-                continue
-            
-            ipa = extract_ipa(entry)
-            
-            # Add each gloss as a separate row (will dedupe on insert)
-            for gloss in glosses:
-                gloss = gloss.strip()
-                if gloss:
-                    batch.append((word, lang, lang_code, ipa, gloss))
-            
-            count += 1
-            
-            # Insert in batches
-            if len(batch) >= 50000:
-                temp_db.executemany(
-                    "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)",
-                    batch
+    for offset, rows, chunk_stats in ingest(
+        RAW_DATA, workers, languages, excluded_languages,
+        start=offset, reader_stats=reader_stats,
+    ):
+        batch.extend(rows)
+        stats.update(chunk_stats)
+        
+        # Insert in batches
+        if len(batch) >= 50000:
+            staging.add(batch)
+            batch = []
+            print(f"  Processed {stats['count']:,} entries...")
+            if time.monotonic() - last_checkpoint >= checkpoint_every:
+                staging.checkpoint(
+                    {"source": source, "offset": offset, "stats": dict(stats)}
                 )
-                temp_db.commit()
-                batch = []
-                print(f"  Processed {count:,} entries...")
+                last_checkpoint = time.monotonic()
+                print(f"  Checkpoint at byte {offset:,}")
     
     # Final batch
     if batch:
-        temp_db.executemany(
-            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)",
-            batch
-        )
-        temp_db.commit()
-    
-    print(f"✓ Read {count:,} entries")
-    print(f"  - Skipped {skipped:,} (short/no glosses)")
-    print(f"  - Skipped {skipped_affixes:,} affixes (prefixes/suffixes)")
-    print(f"  - Skipped {skipped_digits:,} words with digits")
-    print(f"  - Skipped {skipped_loanwords:,} loanwords")
-    
-    # Get unique word count
-    unique_count = temp_db.execute(
-        "SELECT COUNT(DISTINCT word || '|' || lang) FROM entries"
-    ).fetchone()[0]
-    print(f"✓ Found {unique_count:,} unique (word, lang) pairs")
-    
-    # Second pass: aggregate and write to final database
-    print("Aggregating glosses and writing to database...")
-    
-    conn = sqlite3.connect(DB_FILE_NEW)
-    conn.execute("""
-        CREATE TABLE words (
-            word TEXT NOT NULL,
-            lang TEXT NOT NULL,
-            lang_code TEXT,
-            ipa TEXT,
-            glosses TEXT,
-            UNIQUE(word, lang)
+        staging.add(batch)
+    # Ingest is complete; a resume from here goes straight to aggregation
+    staging.checkpoint({"source": source, "offset": offset, "stats": dict(stats)})
+    ingest_seconds = time.perf_counter() - ingest_began
+    
+    mb_read = (offset - ingest_start) / 1e6
+    if reader_stats:
+        reader_mb = reader_stats["bytes"] / 1e6
+        print(
+            f"  Reader: decompressed {reader_mb:,.1f} MB in {reader_stats['seconds']:.1f}s "
+            f"({reader_mb / max(reader_stats['seconds'], 1e-9):,.1f} MB/s)"
         )
-    """)
-    conn.execute("CREATE INDEX idx_word ON words(word)")
-    conn.execute("CREATE INDEX idx_lang ON words(lang)")
-    
-    # Aggregate using SQL
-    # Note: SQLite doesn't support GROUP_CONCAT(DISTINCT x, separator) syntax
-    # But since we already deduplicated glosses via PRIMARY KEY, we can just use GROUP_CONCAT
-    cursor = temp_db.execute("""
-        SELECT 
-            word,
-            lang,
-            MAX(lang_code) as lang_code,
-            MAX(ipa) as ipa,
-            GROUP_CONCAT(gloss, ' | ') as glosses
-        FROM entries
-        GROUP BY word, lang
-        ORDER BY word, lang
-    """)
+    print(
+        f"  Parser: {mb_read:,.1f} MB in {ingest_seconds:.1f}s "
+        f"({mb_read / max(ingest_seconds, 1e-9):,.1f} MB/s)"
+    )
     
-    batch = []
-    written = 0
+    prefiltered = stats["lines"] - stats["decoded"]
+    print(f"✓ Read {stats['count']:,} entries from {stats['lines']:,} lines")
+    print(f"  Prefilter (raw bytes): rejected {prefiltered:,} lines without decoding")
+    print(f"  - Skipped {stats['pre_no_glosses']:,} without glosses")
+    WORD_FILTERS.report(stats, prefix="pre_")
+    print(f"  - Skipped {stats['pre_languages']:,} filtered languages")
+    print(f"  Full parse: decoded {stats['decoded']:,} lines")
+    WORD_FILTERS.report(stats)
+    print(f"  - Skipped {stats['languages']:,} filtered languages")
+    ENTRY_FILTERS.report(stats)
+    print(f"  - Skipped {stats['no_glosses']:,} without glosses")
     
-    for row in cursor:
-        batch.append(row)
-        
-        if len(batch) >= 10000:
-            conn.executemany(
-                "INSERT INTO words VALUES (?, ?, ?, ?, ?)",
-                batch
-            )
-            conn.commit()
-            written += len(batch)
-            batch = []
-            print(f"  Written {written:,} aggregated entries...")
+    if update:
+        print(f"Aggregating glosses ({aggregate}) and diffing against {DB_FILE}...")
+        update_words_db(staging.aggregate())
+        staging.close()
+        return
     
-    if batch:
-        conn.executemany(
-            "INSERT INTO words VALUES (?, ?, ?, ?, ?)",
-            batch
-        )
-        conn.commit()
-        written += len(batch)
+    # Second pass: aggregate and bulk-load the final database
+    print(f"Aggregating glosses ({aggregate}) and writing to database...")
     
-    conn.close()
-    temp_db.close()
+    writer = BulkWriter(
+        DB_FILE,
+        tables=[WORDS_TABLE, IPA_KEYS_TABLE],
+        indexes=WORDS_INDEXES + IPA_KEYS_INDEXES,
+        tmp_path=DB_FILE_NEW,
+    )
+    written = 0
+    try:
+        for row in staging.aggregate():
+            writer.insert("INSERT INTO words VALUES (?, ?, ?, ?, ?, ?)", (*row, translit_key(row[0])))
+            # Normalized IPA variants, for streaming pronunciation grouping
+            writer.insert_many(INSERT_IPA_KEY, ipa_key_rows(row[0], row[1], row[3]))
+            written += 1
+            if written % 100000 == 0:
+                print(f"  Written {written:,} aggregated entries...")
+        print("  Ordering IPA key groups...")
+        writer.execute(NUMBER_IPA_KEYS.format(where=""))
+        print("  Creating indexes and analyzing...")
+        writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
     
-    # Clean up temp database
-    if os.path.exists(temp_db_path):
-        os.remove(temp_db_path)
-    # Also remove WAL files if they exist
-    for ext in ["-wal", "-shm"]:
-        if os.path.exists(temp_db_path + ext):
-            os.remove(temp_db_path + ext)
+    # Clean up temp database / sorted runs
+    staging.close()
     
-    print(f"✓ Wrote {written:,} aggregated entries to {DB_FILE_NEW}")
+    print(f"✓ Wrote {written:,} aggregated entries to {DB_FILE}")
     
     # Verify the fix
     print("\nVerifying 'hand' in English:")
-    verify_conn = sqlite3.connect(DB_FILE_NEW)
+    verify_conn = sqlite3.connect(DB_FILE)
     result = verify_conn.execute(
         "SELECT glosses FROM words WHERE word = 'hand' AND lang = 'English'"
     ).fetchone()
@@ -365,10 +788,67 @@ def process_data():
         print("  'hand' not found in English")
     verify_conn.close()
     
-    print(f"\n✓ New database ready at {DB_FILE_NEW}")
-    print(f"  To replace the old database, run:")
-    print(f"    mv {DB_FILE_NEW} {DB_FILE}")
+    print(f"\n✓ New database swapped into place at {DB_FILE}")
 
 
 if __name__ == "__main__":
-    process_data()
+    parser = argparse.ArgumentParser(description="Rebuild words.db from raw wiktextract data")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing the raw dump (0 = all cores, default: 1)",
+    )
+    parser.add_argument(
+        "--languages",
+        help="Comma-separated language names to keep (default: all)",
+    )
+    parser.add_argument(
+        "--exclude-languages",
+        help="Comma-separated language names to drop",
+    )
+    parser.add_argument(
+        "--aggregate",
+        choices=["sqlite", "external"],
+        default="sqlite",
+        help="Gloss aggregation backend: words_temp.db table or external sort (default: sqlite)",
+    )
+    parser.add_argument(
+        "--memory-mb",
+        type=int,
+        default=1024,
+        help="Row buffer budget for --aggregate external before spilling a run (default: 1024)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the last checkpoint of an interrupted run",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=CHECKPOINT_SECONDS,
+        help=f"Seconds between ingest checkpoints (default: {CHECKPOINT_SECONDS})",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=f"Update {DB_FILE} in place with only the changed rows and log them to {CHANGES_FILE}",
+    )
+    args = parser.parse_args()
+    languages = LANGUAGES
+    if args.languages:
+        languages = {l.strip() for l in args.languages.split(",") if l.strip()}
+    excluded_languages = EXCLUDED_LANGUAGES
+    if args.exclude_languages:
+        excluded_languages = {l.strip() for l in args.exclude_languages.split(",") if l.strip()}
+    process_data(
+        workers=args.workers or os.cpu_count(),
+        languages=languages,
+        excluded_languages=excluded_languages,
+        aggregate=args.aggregate,
+        memory_mb=args.memory_mb,
+        resume=args.resume,
+        checkpoint_every=args.checkpoint_every,
+        update=args.update,
+    )
@@ -0,0 +1,249 @@
+"""
+Staging backends for rebuild_words_db.py.
+
+Both backends take (word, lang, lang_code, ipa, gloss) rows in file order
+and hand back aggregated words rows sorted by (word, lang):
+
+    (word, lang, lang_code, ipa, glosses)
+
+where glosses is the " | "-joined list of distinct glosses in the order
+they were first seen, and lang_code/ipa are the maximum non-null values
+over the kept gloss rows (the same thing MAX() does in SQLite).
+
+- SqliteStaging: the original words_temp.db table with a
+  PRIMARY KEY (word, lang, gloss), aggregated with GROUP BY/GROUP_CONCAT.
+- ExternalSortStaging: buffers rows in memory, spills sorted and
+  deduplicated runs to disk when the memory budget is reached, then
+  k-way merges the runs into aggregated rows. No B-tree upkeep, and the
+  runs only hold each gloss once.
+
+Both can checkpoint: checkpoint(state) makes everything added so far
+durable and stores the caller's state (byte offset, counters) alongside
+it, and checkpoint_state() reads it back after a restart with
+resume=True. Rows added after the last checkpoint may be replayed on
+resume; both backends drop such duplicates, so replaying is harmless.
+"""
+
+import heapq
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+
+from bulk_load import remove_db_files
+
+# Rough per-row overhead of a tuple of Python strings, used to turn the
+# memory budget into a buffer size
+ROW_OVERHEAD = 360
+RUN_BLOCK_ROWS = 10000
+
+
+class SqliteStaging:
+    """Stage gloss rows in a temporary SQLite table"""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        if not resume:
+            remove_db_files(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Better write performance
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Faster, still safe
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                word TEXT NOT NULL,
+                lang TEXT NOT NULL,
+                lang_code TEXT,
+                ipa TEXT,
+                gloss TEXT NOT NULL,
+                PRIMARY KEY (word, lang, gloss)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_word_lang ON entries(word, lang)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                state TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def add(self, rows):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+
+    def checkpoint(self, state):
+        # Rows are committed by add(), so only the state needs writing
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoint VALUES (1, ?)",
+            (json.dumps(state),)
+        )
+        self.conn.commit()
+
+    def checkpoint_state(self):
+        row = self.conn.execute("SELECT state FROM checkpoint WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def aggregate(self):
+        # Note: SQLite doesn't support GROUP_CONCAT(DISTINCT x, separator) syntax
+        # But since we already deduplicated glosses via PRIMARY KEY, we can just use GROUP_CONCAT
+        return self.conn.execute("""
+            SELECT
+                word,
+                lang,
+                MAX(lang_code) as lang_code,
+                MAX(ipa) as ipa,
+                GROUP_CONCAT(gloss, ' | ') as glosses
+            FROM entries
+            GROUP BY word, lang
+            ORDER BY word, lang
+        """)
+
+    def close(self):
+        self.conn.close()
+        remove_db_files(self.path)
+
+
+class ExternalSortStaging:
+    """Stage gloss rows as sorted runs on disk under a memory budget"""
+
+    def __init__(self, run_dir, memory_mb=1024, resume=False):
+        self.run_dir = run_dir
+        self.checkpoint_path = os.path.join(run_dir, "checkpoint.json")
+        self.budget = memory_mb * 1024 * 1024
+        self.runs = []
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.seq = 0
+        self.state = None
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.runs = [os.path.join(run_dir, name) for name in saved["runs"]]
+            self.seq = saved["seq"]
+            self.state = saved["state"]
+            # Runs spilled after the last checkpoint are replayed from the dump
+            for name in os.listdir(run_dir):
+                if name.startswith("run_") and name not in saved["runs"]:
+                    os.remove(os.path.join(run_dir, name))
+        else:
+            if os.path.exists(run_dir):
+                shutil.rmtree(run_dir)
+            os.makedirs(run_dir)
+
+    def add(self, rows):
+        for word, lang, lang_code, ipa, gloss in rows:
+            # seq keeps file order, which decides gloss order and which
+            # duplicate gloss row wins (like INSERT OR IGNORE)
+            self.buffer.append((word, lang, self.seq, lang_code, ipa, gloss))
+            self.seq += 1
+            self.buffer_bytes += (
+                len(word) + len(lang) + len(gloss) + len(ipa or "")
+                + len(lang_code or "") + ROW_OVERHEAD
+            )
+        if self.buffer_bytes >= self.budget:
+            self.spill()
+
+    def spill(self):
+        """Sort, deduplicate and write the buffer as a new run file"""
+        if not self.buffer:
+            return
+        self.buffer.sort()
+        path = os.path.join(self.run_dir, f"run_{len(self.runs):05d}.pickle")
+        with open(path, "wb") as f:
+            block = []
+            for row in dedupe_glosses(self.buffer):
+                block.append(row)
+                if len(block) >= RUN_BLOCK_ROWS:
+                    pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+                    block = []
+            if block:
+                pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self.runs.append(path)
+        self.buffer = []
+        self.buffer_bytes = 0
+
+    def checkpoint(self, state):
+        # Spill the buffer so every row added so far is in a run file
+        self.spill()
+        saved = {
+            "runs": [os.path.basename(path) for path in self.runs],
+            "seq": self.seq,
+            "state": state,
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self.state = state
+
+    def checkpoint_state(self):
+        return self.state
+
+    def aggregate(self):
+        self.spill()
+        print(f"  Merging {len(self.runs):,} sorted runs...")
+        merged = heapq.merge(*(read_run(path) for path in self.runs))
+        current = None
+        lang_code = ipa = None
+        glosses = []
+        for word, lang, _, row_lang_code, row_ipa, gloss in dedupe_glosses(merged):
+            if (word, lang) != current:
+                if current is not None:
+                    yield (*current, lang_code, ipa, " | ".join(glosses))
+                current = (word, lang)
+                lang_code = ipa = None
+                glosses = []
+            lang_code = max_value(lang_code, row_lang_code)
+            ipa = max_value(ipa, row_ipa)
+            glosses.append(gloss)
+        if current is not None:
+            yield (*current, lang_code, ipa, " | ".join(glosses))
+
+    def close(self):
+        self.buffer = []
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def dedupe_glosses(rows):
+    """Drop repeated glosses within each (word, lang) of a sorted row stream.
+
+    Rows are (word, lang, seq, lang_code, ipa, gloss) sorted by
+    (word, lang, seq), so the first occurrence of a gloss is kept.
+    """
+    current = None
+    seen = set()
+    for row in rows:
+        if (row[0], row[1]) != current:
+            current = (row[0], row[1])
+            seen = set()
+        if row[5] in seen:
+            continue
+        seen.add(row[5])
+        yield row
+
+
+def read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def max_value(current, value):
+    """MAX() over nullable strings, ignoring NULLs like SQLite does"""
+    if value is None:
+        return current
+    if current is None or value > current:
+        return value
+    return current
@@ -0,0 +1,121 @@
+"""
+Transliteration keys for cross-script spelling coincidences.
+
+translit_key() romanizes a (lowercased) word and folds accents, so that
+"bra", "бра" and "brà" all get the key "bra". rebuild_words_db.py stores
+the key in words.translit (indexed), and build_coincidence_db.py groups
+spelling coincidences on it as well as on the exact word.
+
+The romanization is table-driven: SCRIPT_TABLES holds one letter table per
+script, compiled the first time a letter of that script is seen. Each
+character is looked up once per process and the result kept in CHARS, so
+after warm-up a key costs one str.translate call, and ASCII words are
+returned unchanged. Characters of scripts without a table keep their
+letters but lose their accents.
+
+Changing a table changes the keys, so words.db needs a rebuild (or a
+refresh with ensure_translit(conn, rebuild=True)) afterwards.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+SCRIPT_TABLES = {
+    "LATIN": {
+        "ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d",
+        "ð": "d", "þ": "th", "ı": "i", "ħ": "h", "ŋ": "ng",
+    },
+    "CYRILLIC": {
+        "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e",
+        "ё": "yo", "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k",
+        "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+        "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+        "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "",
+        "э": "e", "ю": "yu", "я": "ya",
+        # Ukrainian, Belarusian, Serbian, Macedonian
+        "є": "ye", "і": "i", "ї": "yi", "ґ": "g", "ў": "u", "ђ": "dj",
+        "ј": "j", "љ": "lj", "њ": "nj", "ћ": "c", "џ": "dz", "ѓ": "gj",
+        "ќ": "kj", "ѕ": "dz",
+    },
+    "GREEK": {
+        "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z",
+        "η": "i", "θ": "th", "ι": "i", "κ": "k", "λ": "l", "μ": "m",
+        "ν": "n", "ξ": "x", "ο": "o", "π": "p", "ρ": "r", "σ": "s",
+        "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps",
+        "ω": "o",
+    },
+    "ARMENIAN": {
+        "ա": "a", "բ": "b", "գ": "g", "դ": "d", "ե": "e", "զ": "z",
+        "է": "e", "ը": "e", "թ": "t", "ժ": "zh", "ի": "i", "լ": "l",
+        "խ": "kh", "ծ": "ts", "կ": "k", "հ": "h", "ձ": "dz", "ղ": "gh",
+        "ճ": "ch", "մ": "m", "յ": "y", "ն": "n", "շ": "sh", "ո": "o",
+        "չ": "ch", "պ": "p", "ջ": "j", "ռ": "r", "ս": "s", "վ": "v",
+        "տ": "t", "ր": "r", "ց": "ts", "ւ": "v", "փ": "p", "ք": "k",
+        "օ": "o", "ֆ": "f", "և": "ev",
+    },
+    "GEORGIAN": {
+        "ა": "a", "ბ": "b", "გ": "g", "დ": "d", "ე": "e", "ვ": "v",
+        "ზ": "z", "თ": "t", "ი": "i", "კ": "k", "ლ": "l", "მ": "m",
+        "ნ": "n", "ო": "o", "პ": "p", "ჟ": "zh", "რ": "r", "ს": "s",
+        "ტ": "t", "უ": "u", "ფ": "p", "ქ": "k", "ღ": "gh", "ყ": "q",
+        "შ": "sh", "ჩ": "ch", "ც": "ts", "ძ": "dz", "წ": "ts", "ჭ": "ch",
+        "ხ": "kh", "ჯ": "j", "ჰ": "h",
+    },
+}
+
+TRANSLIT_INDEX = "CREATE INDEX idx_translit ON words(translit, word)"
+
+
+@lru_cache(maxsize=None)
+def script_table(script):
+    """Compiled letter table for one script (upper and lower case)"""
+    table = {}
+    for letter, roman in SCRIPT_TABLES.get(script, {}).items():
+        table[letter] = roman
+        table.setdefault(letter.upper(), roman)
+    return table
+
+
+def romanize_char(ch):
+    name = unicodedata.name(ch, "")
+    table = script_table(name.split(" ", 1)[0])
+    if ch in table:
+        return table[ch]
+    if name.startswith("COMBINING"):
+        return ""  # Accents and other generic diacritics (not vowel signs)
+    decomposed = unicodedata.normalize("NFKD", ch)
+    if decomposed != ch:
+        return "".join(romanize_char(part) for part in decomposed)
+    return ch
+
+
+class CharTable(dict):
+    """str.translate table that romanizes each character on first use"""
+
+    def __missing__(self, code):
+        value = self[code] = romanize_char(chr(code))
+        return value
+
+
+CHARS = CharTable()
+
+
+def translit_key(word):
+    if not word or word.isascii():
+        return word
+    return word.translate(CHARS).lower()
+
+
+def ensure_translit(conn, rebuild=False):
+    """Add and fill words.translit in an existing words.db if it is missing"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(words)")]
+    if "translit" in columns and not rebuild:
+        return
+    print("Adding translit column to words.db...")
+    with conn:
+        if "translit" not in columns:
+            conn.execute("ALTER TABLE words ADD COLUMN translit TEXT")
+        conn.create_function("translit_key", 1, translit_key, deterministic=True)
+        conn.execute("UPDATE words SET translit = translit_key(word)")
+        conn.execute("DROP INDEX IF EXISTS idx_translit")
+        conn.execute(TRANSLIT_INDEX)
@@ -0,0 +1,54 @@
+"""Group cache invalidation and eviction."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import build_coincidence_db  # noqa: E402
+import entry_filters  # noqa: E402
+from group_cache import GroupCache, group_digest  # noqa: E402
+
+ENTRIES = [
+    {"word": "casa", "lang": "Spanish", "lang_code": "es", "ipa": "/ˈkasa/", "glosses": "house"},
+    {"word": "casa", "lang": "Italian", "lang_code": "it", "ipa": "/ˈkaːza/", "glosses": "house, home"},
+]
+
+
+def test_version_covers_thresholds(monkeypatch):
+    version = build_coincidence_db.cache_version()
+    assert build_coincidence_db.cache_version() == version
+    monkeypatch.setattr(entry_filters, "LATIN_SCRIPT_MAX_LENGTH", 4)
+    assert build_coincidence_db.cache_version() != version
+    monkeypatch.undo()
+    for module, name, value in [
+        (build_coincidence_db, "MAX_GLOSSES", 3),
+        (build_coincidence_db, "MIN_LANGS", 3),
+        (build_coincidence_db, "STOP_WORDS", {"the"}),
+        (entry_filters, "BORROWING_PREFIXES", ("borrowed from",)),
+        (entry_filters, "ALTERNATIVE_FORM_MARKER", "variant of"),
+    ]:
+        monkeypatch.setattr(module, name, value)
+        assert build_coincidence_db.cache_version() != version, name
+        monkeypatch.undo()
+    assert build_coincidence_db.cache_version() == version
+
+
+def test_threshold_change_misses_cache(tmp_path, monkeypatch):
+    cache = GroupCache(str(tmp_path / "cache.db"))
+    digest = group_digest(ENTRIES, build_coincidence_db.cache_version())
+    cache.store([(digest, b"reduced")])
+    assert cache.lookup([digest]) == {digest: b"reduced"}
+    monkeypatch.setattr(entry_filters, "LATIN_SCRIPT_MAX_LENGTH", 4)
+    changed = group_digest(ENTRIES, build_coincidence_db.cache_version())
+    assert cache.lookup([changed]) == {}
+    cache.close()
+
+
+def test_eviction_shrinks_file(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = GroupCache(path, max_mb=1)
+    cache.store([(i.to_bytes(4, "big"), os.urandom(50000)) for i in range(100)])
+    cache.close()
+    assert cache.evicted == 80
+    assert os.path.getsize(path) < 2 * 1024 * 1024
@@ -2,11 +2,14 @@
 
 (async function () {
   const DB_URL = "https://raw.githubusercontent.com/lcfb8/lingpoet-data/main/coincidences_1_19.db.gz";
+  // Pools precomputed by scripts/build_wander_pools.py; the database is only read without them
+  const POOLS_URL = "https://raw.githubusercontent.com/lcfb8/lingpoet-data/main/wander_pools.json.gz";
+  const POOLS_VERSION = 1;
+  const WANDER_TABLES = ["spelling_matches", "pronunciation_matches"];
   const GLOSS_OVERLAP_THRESHOLD = 0.10; // 10% - match the Python threshold
   const statusEl = document.getElementById("status");
   const goBtn = document.getElementById("go-wander");
   const grid = document.getElementById("peek-grid");
-  let dataset = []; // rows read from DB only
   const TILE_COUNT = 6;
 
   const setStatus = (s) => { if (statusEl) statusEl.textContent = s; };
@@ -79,7 +82,19 @@
     return keptIndices.map(idx => entries[idx]);
   }
 
-  try {
+  // Precomputed tiles and pools: {version, rules, words: {word: [[lang, ipas, meanings]]},
+  // pools: {primary, secondary}}; every key of words is in the fallback pool
+  async function loadWanderPools() {
+    const resp = await fetch(POOLS_URL);
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    const wander = JSON.parse(pako.ungzip(new Uint8Array(await resp.arrayBuffer()), { to: 'string' }));
+    if (wander.version !== POOLS_VERSION) throw new Error(`Unsupported pools version ${wander.version}`);
+    return wander;
+  }
+
+  // Build the same structure from the database (null if it has no usable rows)
+  async function buildPoolsFromDatabase() {
+    const dataset = [];
     setStatus("Fetching database…");
     const resp = await fetch(DB_URL);
     const ab = await resp.arrayBuffer();
@@ -100,8 +115,8 @@
     console.log('📊 Found tables:', tables);
 
     // Read rows from match tables (spelling_matches, pronunciation_matches)
-    for (const t of tables) {
-      if (t === 'sqlite_sequence') continue; // skip internal table
+    for (const t of WANDER_TABLES) {
+      if (!tables.includes(t)) continue; // older or partial database
       
       try {
         console.log(`✅ Processing table "${t}"`);
@@ -145,11 +160,7 @@
     }
 
     console.log(`📊 Total dataset size: ${dataset.length} rows`);
-    if (dataset.length === 0) {
-      setStatus("Database read succeeded but no usable rows found.");
-      goBtn.disabled = true;
-      return;
-    }
+    if (dataset.length === 0) return null;
 
     // index by word and collect language sets
     const byWord = {};
@@ -188,14 +199,47 @@
       return true; // Non-Latin scripts have no restriction
     }
 
+    // tile contents: deduplicated IPAs and meanings of the first 3 languages
+    const words = {};
+    for (const word of Object.keys(byWord)) {
+      if (!meetsLengthRequirement(word)) continue;
+      const info = byWord[word];
+      words[word] = Array.from(info.langs).slice(0,3).map(lang => {
+        const rows = info.rows.filter(r => String(r.language) === String(lang));
+        const ipas = Array.from(new Set(rows.map(r=>r.ipa).filter(Boolean)));
+        const meanings = Array.from(new Set(rows.map(r=>r.meaning).filter(Boolean)));
+        return [lang, ipas, meanings];
+      });
+    }
+    // candidates: words present in >=3 distinct languages, secondary: exactly 2
+    const inPool = (test) => Object.keys(words).filter(w => test(byWord[w].langs.size));
+    return { words, pools: { primary: inPool(n => n >= 3), secondary: inPool(n => n === 2) } };
+  }
+
+  try {
+    let wander;
+    try {
+      setStatus("Fetching word pools…");
+      wander = await loadWanderPools();
+    } catch (e) {
+      console.log('⚠️  Precomputed pools unavailable, reading the database:', e);
+      wander = await buildPoolsFromDatabase();
+    }
+    if (!wander) {
+      setStatus("Database read succeeded but no usable rows found.");
+      goBtn.disabled = true;
+      return;
+    }
+    const words = wander.words;
+
     function shuffle(a){ for (let i=a.length-1;i>0;i--){const j=Math.floor(Math.random()*(i+1)); [a[i],a[j]]=[a[j],a[i]] } return a; }
 
     // candidates: words present in >=3 distinct languages AND meet length requirement
-    const primaryCandidates = shuffle(Object.entries(byWord).filter(([w,v]) => v.langs.size >= 3 && meetsLengthRequirement(w)).map(([w]) => w));
-    // secondary: >=2 languages AND meet length requirement
-    const secondaryCandidates = shuffle(Object.entries(byWord).filter(([w,v]) => v.langs.size === 2 && meetsLengthRequirement(w)).map(([w]) => w));
+    const primaryCandidates = shuffle(wander.pools.primary.slice());
+    // secondary: exactly 2 languages AND meet length requirement
+    const secondaryCandidates = shuffle(wander.pools.secondary.slice());
     // fallback: any word that meets length requirement
-    const allWords = shuffle(Object.keys(byWord).filter(w => meetsLengthRequirement(w)));
+    const allWords = shuffle(Object.keys(words));
 
     function pickRandomWords() {
       const chosen = [];
@@ -254,13 +298,11 @@
         backWordSpan.textContent = it.word || "—";
         back.appendChild(backWordSpan);
 
-        const info = byWord[it.word] || { rows: [], langs: new Set() };
-        const langs = Array.from(info.langs).slice(0,3);
+        const langs = words[it.word] || [];
         if (langs.length === 0) {
           back.innerHTML += "<p class='muted'>No entries found for this word.</p>";
         } else {
-          for (const lang of langs) {
-            const rows = info.rows.filter(r => String(r.language) === String(lang));
+          for (const [lang, ipas, meanings] of langs) {
             const wrapper = document.createElement("div");
             wrapper.className = "meaning-row";
             const langLabel = document.createElement("div");
@@ -268,8 +310,6 @@
             langLabel.textContent = lang;
             wrapper.appendChild(langLabel);
 
-            const ipas = Array.from(new Set(rows.map(r=>r.ipa).filter(Boolean)));
-            const meanings = Array.from(new Set(rows.map(r=>r.meaning).filter(Boolean)));
             if (ipas.length) {
               const ipEl = document.createElement("p");
               ipEl.innerHTML = "<strong>IPA:</strong> " + ipas.join(" · ");
@@ -116,6 +116,20 @@ async function loadLanguages() {
     try {
         if (!db) return;
 
+        // Precomputed at build time, already in rank order
+        const statsResult = loadLanguageStats();
+        if (statsResult) {
+            allLanguagesData = statsResult[0].values.map(([lang, count]) => ({ lang, count }));
+            if (allLanguagesData.length === 0) {
+                document.getElementById('languageList').innerHTML = '<div class="dropdown-no-results">No languages found</div>';
+                return;
+            }
+            renderLanguageDropdown();
+            updateDropdownPlaceholder();
+            return;
+        }
+
+        // Older databases without language_stats: count from the entries
         const langCounts = new Map();  // lang -> count of coincidences
 
         // Count from spelling matches
@@ -172,6 +186,15 @@ async function loadLanguages() {
     }
 }
 
+function loadLanguageStats() {
+    try {
+        const result = db.exec("SELECT lang, total FROM language_stats ORDER BY rank");
+        return result.length > 0 ? result : null;
+    } catch (e) {
+        return null;  // No language_stats table
+    }
+}
+
 function renderLanguageDropdown(filter = '') {
     const container = document.getElementById('languageList');
     let langsToShow;
@@ -373,35 +396,31 @@ async function searchDatabase(query) {
 
     if (searchKey.length < 2) return [];
 
-    let sql, result;
+    let result;
     
     console.log('searchDatabase called with currentTab:', currentTab, 'query:', query);
     
-    if (currentTab === 'spelling') {
-        // For spelling, search by match_key directly
-        sql = `
-            SELECT match_key, languages, gloss_overlap, entries
-            FROM ${table}
-            WHERE match_key LIKE ?
-            ORDER BY languages DESC
-            LIMIT 100
-        `;
-        console.log('Searching spelling_matches with:', searchKey);
-        result = db.exec(sql, [`%${searchKey}%`]);
-    } else {
+    if (currentTab !== 'spelling') {
         // For pronunciation, normalize IPA and search by match_key
         searchKey = normalizeIpa(query);
         if (searchKey.length < 2) return [];
-        
-        sql = `
+        console.log('Searching pronunciation_matches with normalized IPA:', searchKey);
+    } else {
+        console.log('Searching spelling_matches with:', searchKey);
+    }
+
+    if (hasKeyGrams()) {
+        const [sql, params] = keyGramSearch(table, searchKey);
+        result = db.exec(sql, params);
+    } else {
+        // Databases without match_key_grams: scan the table
+        result = db.exec(`
             SELECT match_key, languages, gloss_overlap, entries
-            FROM pronunciation_matches
+            FROM ${table}
             WHERE match_key LIKE ?
             ORDER BY languages DESC
             LIMIT 100
-        `;
-        console.log('Searching pronunciation_matches with normalized IPA:', searchKey);
-        result = db.exec(sql, [`%${searchKey}%`]);
+        `, [`%${searchKey}%`]);
     }
 
     if (result.length === 0) return [];
@@ -444,17 +463,64 @@ async function searchDatabase(query) {
         }
     }
 
-    // Sort results: exact matches first, then by number of languages
+    // Sort results: exact matches first, then keys starting with the query, then by number of languages
     results.sort((a, b) => {
         const aExact = a.match_key === searchKey ? 0 : 1;
         const bExact = b.match_key === searchKey ? 0 : 1;
         if (aExact !== bExact) return aExact - bExact;
+        const aPrefix = a.match_key.startsWith(searchKey) ? 0 : 1;
+        const bPrefix = b.match_key.startsWith(searchKey) ? 0 : 1;
+        if (aPrefix !== bPrefix) return aPrefix - bPrefix;
         return b.languages - a.languages;
     });
 
     return results;
 }
 
+let keyGramsAvailable = null;
+
+function hasKeyGrams() {
+    if (keyGramsAvailable === null) {
+        const result = db.exec("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'match_key_grams'");
+        keyGramsAvailable = result.length > 0;
+    }
+    return keyGramsAvailable;
+}
+
+// Same query as search_sql() in scripts/key_search.py: look the query's
+// trigrams up in match_key_grams, then confirm and rank the candidates
+function keyGramSearch(table, searchKey, limit = 100) {
+    const kind = table === 'spelling_matches' ? 'spelling' : 'pronunciation';
+    const chars = Array.from(searchKey);
+    let candidates, params;
+    if (chars.length >= 3) {
+        const grams = [...new Set(chars.slice(0, -2).map((_, i) => chars.slice(i, i + 3).join('')))];
+        candidates = `
+            SELECT match_id FROM match_key_grams
+            WHERE kind = ? AND gram IN (${grams.map(() => '?').join(', ')})
+            GROUP BY match_id
+            HAVING COUNT(*) = ?
+        `;
+        params = [kind, ...grams, grams.length];
+    } else {
+        candidates = `
+            SELECT DISTINCT match_id FROM match_key_grams
+            WHERE kind = ? AND gram >= ? AND gram <= ?
+        `;
+        params = [kind, searchKey, searchKey + '\u{10FFFF}'];
+    }
+    const sql = `
+        SELECT m.match_key, m.languages, m.gloss_overlap, m.entries
+        FROM (${candidates}) c
+        JOIN ${table} m ON m.id = c.match_id
+        WHERE instr(m.match_key, ?) > 0
+        ORDER BY m.match_key = ? DESC, substr(m.match_key, 1, ?) = ? DESC,
+                 m.languages DESC, m.match_key
+        LIMIT ?
+    `;
+    return [sql, [...params, searchKey, searchKey, chars.length, searchKey, limit]];
+}
+
 function renderResults(results) {
     const container = document.getElementById('results');
 
@@ -583,6 +649,55 @@ function clearExploreLanguages() {
     document.getElementById('exploreResults').innerHTML = '';
 }
 
+// Matches with at least two of the given languages, from the
+// language_pair_matches postings; older databases read the whole table
+function exploreRows(table, languages) {
+    const kind = table === 'spelling_matches' ? 'spelling' : 'pronunciation';
+    const hasPairs = db.exec(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'language_pair_matches'"
+    ).length > 0;
+    if (!hasPairs) {
+        return db.exec(`SELECT id, match_key, entries FROM ${table}`);
+    }
+    const placeholders = languages.map(() => '?').join(', ');
+    const langIds = `SELECT id FROM languages WHERE lang IN (${placeholders})`;
+    return db.exec(`
+        SELECT id, match_key, entries FROM ${table}
+        WHERE id IN (
+            SELECT match_id FROM language_pair_matches
+            WHERE lang_a_id IN (${langIds}) AND lang_b_id IN (${langIds}) AND kind = ?
+        )
+        ORDER BY id
+    `, [...languages, ...languages, kind]);
+}
+
+// pronunciation match id -> ids of the spelling matches sharing an entry in
+// one of the given languages, from match_links; null for older databases
+function exploreLinks(languages) {
+    const hasLinks = db.exec(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'match_links'"
+    ).length > 0;
+    if (!hasLinks) return null;
+    const placeholders = languages.map(() => '?').join(', ');
+    const langIds = `SELECT id FROM languages WHERE lang IN (${placeholders})`;
+    const result = db.exec(`
+        SELECT pronunciation_id, spelling_id FROM match_links
+        WHERE pronunciation_id IN (
+            SELECT match_id FROM language_pair_matches
+            WHERE lang_a_id IN (${langIds}) AND lang_b_id IN (${langIds}) AND kind = 'pronunciation'
+        )
+        AND lang_id IN (${langIds})
+    `, [...languages, ...languages, ...languages]);
+    const links = new Map();
+    if (result.length > 0) {
+        for (const [pronunciationId, spellingId] of result[0].values) {
+            if (!links.has(pronunciationId)) links.set(pronunciationId, []);
+            links.get(pronunciationId).push(spellingId);
+        }
+    }
+    return links;
+}
+
 async function findCoincidences() {
     if (exploreSelectedLanguages.length < 2) {
         alert('Please select at least 2 languages to find coincidences');
@@ -597,12 +712,13 @@ async function findCoincidences() {
         try {
             const results = [];
             const selectedSet = new Set(exploreSelectedLanguages);
+            const spellingIndex = new Map();  // spelling match id -> index in results
             
             // Search spelling matches
-            const spellingResult = db.exec("SELECT match_key, entries FROM spelling_matches");
+            const spellingResult = exploreRows('spelling_matches', exploreSelectedLanguages);
             if (spellingResult.length > 0) {
                 for (const row of spellingResult[0].values) {
-                    const [matchKey, entriesJson] = row;
+                    const [matchId, matchKey, entriesJson] = row;
                     try {
                         const entries = JSON.parse(entriesJson);
                         const matchingEntries = entries.filter(e => selectedSet.has(e.lang));
@@ -611,6 +727,7 @@ async function findCoincidences() {
                             // Check if we have entries from at least 2 different selected languages
                             const uniqueLangs = new Set(matchingEntries.map(e => e.lang));
                             if (uniqueLangs.size >= 2) {
+                                spellingIndex.set(matchId, results.length);
                                 results.push({
                                     word: matchKey,
                                     type: 'spelling',
@@ -623,10 +740,11 @@ async function findCoincidences() {
             }
             
             // Search pronunciation matches
-            const pronResult = db.exec("SELECT match_key, entries FROM pronunciation_matches");
+            const pronResult = exploreRows('pronunciation_matches', exploreSelectedLanguages);
+            const links = pronResult.length > 0 ? exploreLinks(exploreSelectedLanguages) : null;
             if (pronResult.length > 0) {
                 for (const row of pronResult[0].values) {
-                    const [matchKey, entriesJson] = row;
+                    const [matchId, matchKey, entriesJson] = row;
                     try {
                         const entries = JSON.parse(entriesJson);
                         const matchingEntries = entries.filter(e => selectedSet.has(e.lang));
@@ -635,14 +753,26 @@ async function findCoincidences() {
                             const uniqueLangs = new Set(matchingEntries.map(e => e.lang));
                             if (uniqueLangs.size >= 2) {
                                 // Check if this is also a spelling match (mark as 'both')
-                                const existingIdx = results.findIndex(r => 
-                                    r.type === 'spelling' && 
-                                    r.entries.some(re => 
-                                        matchingEntries.some(me => 
-                                            re.lang === me.lang && re.word === me.word
+                                let existingIdx = -1;
+                                if (links !== null) {
+                                    // The first linked spelling result not already marked
+                                    for (const spellingId of links.get(matchId) || []) {
+                                        const idx = spellingIndex.get(spellingId);
+                                        if (idx !== undefined && results[idx].type === 'spelling' &&
+                                            (existingIdx < 0 || idx < existingIdx)) {
+                                            existingIdx = idx;
+                                        }
+                                    }
+                                } else {
+                                    existingIdx = results.findIndex(r => 
+                                        r.type === 'spelling' && 
+                                        r.entries.some(re => 
+                                            matchingEntries.some(me => 
+                                                re.lang === me.lang && re.word === me.word
+                                            )
                                         )
-                                    )
-                                );
+                                    );
+                                }
                                 
                                 if (existingIdx >= 0) {
                                     results[existingIdx].type = 'both';